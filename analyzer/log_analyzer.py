@@ -2,6 +2,9 @@ import os, sys, inspect
 import json
 import re
 import csv
+import gzip
+import itertools
+from collections import OrderedDict
 from prettytable import PrettyTable
 
 import networkx as nx
@@ -12,6 +15,7 @@ current_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentfra
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 from utils.color_print import ColorPrint
+from utils.event_log import render_event_log
 
 
 def get_file_suffix():
@@ -19,6 +23,28 @@ def get_file_suffix():
     return sys.argv[1][idx[2] + 1 : idx[4]]
 
 
+def open_log(log_file):
+    """
+    Open the log for reading as text - logs compressed with gzip (*.gz) are decompressed on the fly
+    """
+    if log_file.endswith('.gz'):
+        return gzip.open(log_file, 'rt')
+    return open(log_file, 'r')
+
+
+def read_log_lines(log_file):
+    """
+    Yield the lines of the log followed by the rendered events, if they were recorded in a separate file
+    """
+    with open_log(log_file) as f:
+        yield from f
+
+    log_file_name = log_file[:-len('.gz')] if log_file.endswith('.gz') else log_file
+    event_log_file = f"{os.path.splitext(log_file_name)[0]}.events"
+    if os.path.exists(event_log_file):
+        yield from render_event_log(event_log_file)
+
+
 def extract_nodes(line):
     nodes = []
     start_idx = 0
@@ -42,7 +68,7 @@ def create_graph(log_file, verbose=False):
     pc_flag = 0
     leaders = []
 
-    with open(log_file, 'r') as f:
+    with open_log(log_file) as f:
         for line in f:
             if 'Principal Committee Nodes' in line:
                 pc_flag = 1
@@ -111,50 +137,113 @@ def create_graph(log_file, verbose=False):
     vis_net.save_graph(f"logs_data/interactive_plots/{filename}.html")
 
 
-def analyse_tx_blocks(log_file):
-    relevant_lines = []
-    ids = set()
-    keywords = ['propagated', 'received', 'voted']
+TX_BLOCK_ID = re.compile(r'TB_FN[0-9]+_[0-9a-f-]+')
 
-    with open(log_file, 'r') as f:
-        for line in f:
-            res = re.search('TB_FN[0-9]+_[0-9]+', line)
-            if res:
-                relevant_lines.append(line)
-                ids.add(line[res.start() : res.end()])
-    
+
+def parse_tx_block_line(line):
+    """
+    Return (tx-block id, timestamp, sender, receiver) of a line tracing a tx-block, None for other lines
+    """
+    res = TX_BLOCK_ID.search(line)
+    if not res:
+        return None
+
+    timestamp = line[0 : line.find(':') - 1]
+    if 'propagated' in line:
+        receiver = extract_nodes(line)
+        sender = line[line.find('Node') + 4 : line.find('propagated') - 1]
+    elif 'received' in line:
+        receiver = line[line.find('Node') + 4 : line.find('received') - 1]
+        sender = "[voted block]" if line.find('from') == -1 else line[line.find('from') + 4 : line.find('\n')]
+    else:
+        return None
+
+    return res.group(), timestamp, sender, receiver
+
+
+def analyse_tx_blocks(log_file, max_buffered_rows=100000):
+    """
+    Group the trace of every tx-block in a single pass over the log. The rows are buffered per tx-block
+    and the least recently active tx-blocks are written out once max_buffered_rows is exceeded, so a
+    tx-block that is active again afterwards continues in a new group further down the output.
+    """
     filename = "metadata_" + get_file_suffix()
     col_names = ['Tx-Block ID', 'Timestamp', 'Sender', 'Receiver']
+    csv_file = f"logs_data/metadata/{filename}.csv"
+
+    ColorPrint.print_info(f"[Info]: Preparing csv file '{csv_file}'")
+    with open(csv_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(col_names)
+
+        index = OrderedDict()           # tx-block id -> rows, ordered by the last activity
+        num_buffered_rows = 0
+
+        def write_group(id, rows):
+            writer.writerow([id, '', '', ''])
+            writer.writerows(rows)
+
+        for line in read_log_lines(log_file):
+            res = parse_tx_block_line(line)
+            if res is None:
+                continue
+
+            id, timestamp, sender, receiver = res
+            if id in index:
+                index.move_to_end(id)
+            else:
+                index[id] = []
+            index[id].append(['', timestamp, sender, receiver])
+            num_buffered_rows += 1
+
+            while num_buffered_rows > max_buffered_rows:
+                oldest_id, rows = index.popitem(last=False)
+                write_group(oldest_id, rows)
+                num_buffered_rows -= len(rows)
+
+        for id, rows in index.items():
+            write_group(id, rows)
+
+    ColorPrint.print_info(f"[Info]: Writing metadata in file 'logs_data/metadata/{filename}.txt'\n")
+    write_table(csv_file, f"logs_data/metadata/{filename}.txt")
+
+
+def write_table(csv_file, text_file, chunk_size=10000):
+    """
+    Render the csv file as a text table, chunk by chunk with the column widths of the entire file
+    """
+    with open(csv_file, 'r', newline='') as f:
+        reader = csv.reader(f)
+        col_names = next(reader)
+        widths = [len(name) for name in col_names]
+        for row in reader:
+            widths = [max(width, len(value)) for width, value in zip(widths, row)]
 
-    ColorPrint.print_info(f"[Info]: Preparing csv file 'logs_data/metadata/{filename}.csv'")
-    writer = csv.writer(open(f"logs_data/metadata/{filename}.csv", 'w'))
-    writer.writerow(col_names)
     pt = PrettyTable()
     pt.field_names = col_names
+    pt.min_width = dict(zip(col_names, widths))
 
-    for id in ids:
-        writer.writerow([id, '', '', ''])
-        pt.add_row([id, '', '', ''])
-        for line in relevant_lines:
-            if id in line:
-                timestamp = line[0 : line.find(':') - 1]
-                # print(timestamp)
-                receiver, sender = None, None
-                if keywords[0] in line:
-                    receiver = extract_nodes(line)
-                    sender = line[line.find('Node') + 4 : line.find('propagated') - 1]
-                elif keywords[1] in line:
-                    receiver = line[line.find('Node') + 4 : line.find('received') - 1]
-                    sender = "[voted block]" if line.find('from') == -1 else line[line.find('from') + 4 : line.find('\n')]
-                else:
-                    continue
-
-                writer.writerow(['', timestamp, sender, receiver])
-                pt.add_row(['', timestamp, sender, receiver])
+    with open(csv_file, 'r', newline='') as f, open(text_file, 'w') as out:
+        reader = csv.reader(f)
+        next(reader)
 
-    ColorPrint.print_info(f"[Info]: Writing metadata in file 'logs_data/metadata/{filename}.txt'\n")
-    with open(f"logs_data/metadata/{filename}.txt", "w") as text_file:
-        text_file.write(pt.get_string())
+        # Each chunk is a table of its own, the borders in between the chunks are dropped
+        first_chunk, pending_border = True, None
+        for chunk in iter(lambda: list(itertools.islice(reader, chunk_size)), []):
+            pt.clear_rows()
+            pt.add_rows(chunk)
+            lines = pt.get_string(header=first_chunk).split('\n')
+            if not first_chunk:
+                lines = lines[1:]
+
+            out.write("\n".join(lines[:-1]) + "\n")
+            pending_border = lines[-1]
+            first_chunk = False
+
+        if first_chunk:
+            out.write(pt.get_string())
+        else:
+            out.write(pending_border)
 
 
 def main():
@@ -4,46 +4,112 @@ import re
 import csv
 import glob
 import pathlib
+from concurrent.futures import ProcessPoolExecutor
 
 current_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 from utils.color_print import ColorPrint
+from utils.metrics import SUMMARY_COLUMNS, read_summary
 
 
-def add_cell_entry(query, row_data, line):
-    res = re.search(query, line)
-    if res:
-        row_data.append(line[res.end() : len(line)-1])
+SUMMARY_HEADER = "============  SIMULATION DETAILS  ============"
 
+# Single matcher for all the summary lines - "<column name> = <value>"
+SUMMARY_LINE = re.compile(r"^(" + "|".join(re.escape(column) for column in SUMMARY_COLUMNS) + r") = (.*)$", re.MULTILINE)
+
+
+def read_summary_footer(log_file, block_size=1 << 16, max_scan_size=1 << 24):
+    """
+    Return the text of the log from the summary header onwards, reading backwards from the end
+    of the file in blocks (only the new block and the overlap with the previous one is searched).
+    Returns None if the header isn't found within the last max_scan_size bytes.
+    """
+    header = SUMMARY_HEADER.encode()
+    overlap = len(header) - 1
+    with open(log_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        stop = max(position - max_scan_size, 0)
+        chunks = []             # Blocks read so far, from the last one backwards
+
+        while position > stop:
+            read_size = min(block_size, position - stop)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+
+            # The header may straddle the boundary with the previously read block
+            window = block + chunks[-1][ : overlap] if chunks else block
+            chunks.append(block)
+
+            idx = window.rfind(header)
+            if idx != -1:
+                return (window[idx : len(block)] + b"".join(reversed(chunks[ : -1]))).decode()
+
+    return None
+
+
+def scan_summary_lines(log_file, block_size=1 << 22):
+    """
+    Return the summary values found anywhere in the log, in a single forward pass over the file
+    (for the logs without the summary header near the end, e.g. a truncated run)
+    """
+    values = {}
+    with open(log_file, 'r', errors='replace') as f:
+        remainder = ""
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+
+            # Match only the complete lines, the last partial line is carried over to the next block
+            data = remainder + data
+            end = data.rfind("\n") + 1
+            values.update(SUMMARY_LINE.findall(data[ : end]))
+            remainder = data[end : ]
+
+        values.update(SUMMARY_LINE.findall(remainder))
+    return values
+
+
+def summarize_log(log_file):
+    """
+    Return the row of the summary table for a log - missing values are left empty
+    """
+    footer = read_summary_footer(log_file)
+    values = dict(SUMMARY_LINE.findall(footer)) if footer is not None else scan_summary_lines(log_file)
+    return [ values.get(column, '') for column in SUMMARY_COLUMNS ]
+
+
+def summarize_json(summary_file):
+    summary = read_summary(summary_file)
+    return [ summary.get(column, '') for column in SUMMARY_COLUMNS ]
+
+
+def summarize(dir, max_workers=None):
+    # Runs which emitted their results in JSON are summarized directly, the logs are scanned only for the rest
+    summary_files = sorted(glob.glob(dir+'/*.json'))
+    summarized_runs = {os.path.splitext(summary_file)[0] for summary_file in summary_files}
+    log_files = sorted(glob.glob(dir+'/*.log'))
+    log_files = [log_file for log_file in log_files if os.path.splitext(log_file)[0] not in summarized_runs]
 
-def summarize(dir):
-    log_files = glob.glob(dir+'/*')
-    queries = ['Number of nodes = ', 'Number of shards = ', 'Fraction of cross-shard tx = ', 'Total no of transactions included in Blockchain = ', \
-                'Total no of intra-shard transactions included in Blockchain = ', 'Total no of cross-shard transactions included in Blockchain = ', \
-                'Total no of transactions processed = ', 'Total no of intra-shard transactions processed = ', 'Total no of cross-shard transactions processed = ', \
-                'Total no of transactions generated = ', 'Total no of intra-shard transactions generated = ', 'Total no of cross-shard transactions generated = ', \
-                'Processed TPS = ', 'Accepted TPS = ']
-    
-    col_names = [name.rstrip(' = ') for name in queries]
-    
     dir_name = f"logs_data/summary/{pathlib.PurePath(dir).parent.name}"
     if not os.path.exists(dir_name):
         ColorPrint.print_info(f"\n[Info]: Creating directory '{dir_name}' for storing summary of the simulation logs\n")
     pathlib.Path(dir_name).mkdir(parents=True, exist_ok=True)
 
     filename = f"{dir_name}/{os.path.basename(os.path.normpath(dir))}_summary.csv"
-    writer = csv.writer(open(filename, 'w'))
-    writer.writerow(col_names)
-
-    for log_file in log_files:
-        ColorPrint.print_info(f"[Info]: Summarizing {log_file} ...")
-        row_data = []
-        with open(log_file, 'r') as f:
-            for line in f:
-                for query in queries:
-                    add_cell_entry(query, row_data, line)
-            writer.writerow(row_data)
+    with open(filename, 'w', newline='') as f, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_COLUMNS)
+
+        for row in executor.map(summarize_json, summary_files):
+            writer.writerow(row)
+
+        ColorPrint.print_info(f"[Info]: Summarizing {len(log_files)} log files ...")
+        for row in executor.map(summarize_log, log_files):
+            writer.writerow(row)
 
     ColorPrint.print_info(f"[Info]: Writing metadata in file '{filename}'\n")
 
@@ -0,0 +1,91 @@
+import os, sys, inspect
+import time
+import numpy as np
+import simpy
+
+current_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+from network.pipe import Pipe
+from network.latency_model import LatencyModel
+from utils.delay_sampler import DelaySampler
+from utils.color_print import ColorPrint
+
+
+LOCATIONS = ["Ireland", "Tokyo", "Ohio"]
+
+
+class CountingEnvironment(simpy.Environment):
+    """
+    SimPy environment which counts the processed events
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.event_count = 0
+
+    def step(self):
+        self.event_count += 1
+        super().step()
+
+
+class BenchNode:
+    def __init__(self, id, location):
+        self.id = id
+        self.location = location
+
+
+def receiver(pipe, counter):
+    while True:
+        yield pipe.get()
+        counter[0] += 1
+
+
+def sender(env, node, pipes, neighbours):
+    """
+    Gossip one message per time unit to each row of neighbours
+    """
+    for neighbour_ids in neighbours:
+        yield env.timeout(1)
+        for neighbour in neighbour_ids:
+            pipes[neighbour].put_data(node.id, node.location)
+
+
+def run(num_nodes, mode, degree=8, num_messages=50, seed=7):
+    params = {"locations": LOCATIONS, "delay": {src: {dest: {"mu": 0.1, "sigma": 0.01} for dest in LOCATIONS} for src in LOCATIONS}}
+    rng = np.random.default_rng(seed)
+    latency_model = LatencyModel(params, DelaySampler(seed))
+
+    env = CountingEnvironment()
+    nodes = {idx: BenchNode(idx, LOCATIONS[idx % len(LOCATIONS)]) for idx in range(num_nodes)}
+    pipes = [ Pipe(env, idx, nodes, latency_model, mode) for idx in range(num_nodes) ]
+
+    counter = [0]
+    for idx in range(num_nodes):
+        env.process(receiver(pipes[idx], counter))
+        neighbours = rng.integers(0, num_nodes, size=(num_messages, degree)).tolist()
+        env.process(sender(env, nodes[idx], pipes, neighbours))
+
+    start_time = time.time()
+    env.run()
+    wall_time = time.time() - start_time
+
+    return counter[0], env.event_count, wall_time
+
+
+def main():
+    num_nodes_list = [int(arg) for arg in sys.argv[1:]] or [100, 500]
+
+    for num_nodes in num_nodes_list:
+        ColorPrint.print_info(f"\n[Info]: Benchmarking pipe modes with {num_nodes} nodes")
+        results = {}
+        for mode in ["process", "event"]:
+            messages, events, wall_time = run(num_nodes, mode)
+            results[mode] = wall_time
+            print(f"{mode:>8} : {messages} messages, {events} events ({events / messages:.2f} per message) in {wall_time:.3f} s "
+                  f"-> {messages / wall_time:,.0f} messages/s")
+        print(f"Speed-up of 'event' over 'process' mode = {results['process'] / results['event']:.2f}x")
+
+
+if __name__=="__main__":
+    main()
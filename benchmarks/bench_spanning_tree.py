@@ -0,0 +1,61 @@
+import os, sys, inspect
+import time
+import numpy as np
+import networkx as nx
+
+current_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+from network.topology import random_regular_graph
+from utils.graph_algorithms import kruskal, prim, get_adjacency, bfs_parents
+from utils.color_print import ColorPrint
+
+
+def timed(function, *args):
+    start_time = time.time()
+    result = function(*args)
+    return result, time.time() - start_time
+
+
+def run(num_nodes, degree=8, seed=7):
+    """
+    Build the spanning tree of a random-regular shard with random link latencies,
+    checking the weight of the trees against networkx
+    """
+    rng = np.random.default_rng(seed)
+    sources, destinations = random_regular_graph(list(range(num_nodes)), degree, rng).edges()
+    weights = rng.random(sources.size)
+
+    tree_edges, kruskal_time = timed(kruskal, num_nodes, sources, destinations, weights)
+    parents, prim_time = timed(prim, num_nodes, sources, destinations, weights, 0)
+    indptr, indices, _ = get_adjacency(
+        num_nodes, np.concatenate([sources, destinations]), np.concatenate([destinations, sources])
+    )
+    _, bfs_time = timed(bfs_parents, num_nodes, indptr, indices, 0)
+
+    graph = nx.Graph()
+    graph.add_weighted_edges_from(zip(sources.tolist(), destinations.tolist(), weights.tolist()))
+    tree, networkx_time = timed(nx.minimum_spanning_tree, graph)
+
+    weight_of = { (u, v): w for u, v, w in zip(sources.tolist(), destinations.tolist(), weights.tolist()) }
+    weight_of.update({ (v, u): w for (u, v), w in list(weight_of.items()) })
+    prim_weight = sum(weight_of[(u, v)] for u, v in enumerate(parents.tolist()) if v >= 0)
+    expected_weight = tree.size(weight="weight")
+    if not np.isclose(weights[tree_edges].sum(), expected_weight) or not np.isclose(prim_weight, expected_weight):
+        raise RuntimeError(f"Weight of the spanning tree differs from networkx for {num_nodes} nodes")
+
+    return sources.size, kruskal_time, prim_time, bfs_time, networkx_time
+
+
+def main():
+    num_nodes_list = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 10000]
+
+    ColorPrint.print_info("\n[Info]: Benchmarking spanning trees of random-regular shards of degree 8")
+    print(f"{'nodes':>7} {'edges':>7} {'kruskal':>10} {'prim':>10} {'bfs':>10} {'networkx':>10}")
+    for num_nodes in num_nodes_list:
+        num_edges, *times = run(num_nodes)
+        print(f"{num_nodes:>7} {num_edges:>7} " + " ".join(f"{wall_time * 1000:8.2f}ms" for wall_time in times))
+
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,57 @@
+import os, sys, inspect
+import time
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+from network.topology import build_topology, get_dense_neighbours
+from network.latency_model import LatencyModel
+from utils.color_print import ColorPrint
+
+
+LOCATIONS = ["Ireland", "Tokyo", "Ohio"]
+MAX_DENSE_NODES = 2000      # the dense model grows quadratically
+
+
+def run(num_nodes, model, params, latency_model):
+    node_ids = list(range(num_nodes))
+    locations = np.random.choice(LOCATIONS, size=num_nodes).tolist()
+
+    start_time = time.time()
+    if model == "dense":
+        neighbours_info = get_dense_neighbours(node_ids)
+        num_links = sum(len(neighbours) for neighbours in neighbours_info.values())
+    else:
+        topology = build_topology(node_ids, locations, dict(params, topology_model=model), latency_model)
+        neighbours_info = topology.get_neighbours_ids()
+        num_links = len(topology.indices)
+    wall_time = time.time() - start_time
+
+    return num_links / num_nodes, wall_time
+
+
+def main():
+    num_nodes_list = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000]
+
+    np.random.seed(7)
+    params = {
+        "locations": LOCATIONS,
+        "delay": {src: {dest: {"mu": 0.001 if src == dest else 0.1, "sigma": 0.0} for dest in LOCATIONS} for src in LOCATIONS},
+        "topology_degree": 8,
+        "topology_rewire_probability": 0.1,
+    }
+    latency_model = LatencyModel(params)
+
+    for num_nodes in num_nodes_list:
+        ColorPrint.print_info(f"\n[Info]: Benchmarking topology models with {num_nodes} nodes")
+        for model in ["dense", "random-regular", "small-world", "geographic"]:
+            if model == "dense" and num_nodes > MAX_DENSE_NODES:
+                print(f"{model:>14} : skipped")
+                continue
+            degree, wall_time = run(num_nodes, model, params, latency_model)
+            print(f"{model:>14} : mean degree {degree:7.2f} built in {wall_time:.3f} s")
+
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Policies of the shard leaders for batching the transactions of the pool into tx-blocks.
+
+A policy decides how many transactions the leader waits for and how long at most
+(get_trigger), and how many transactions are cut into the tx-block once it is ready
+(get_batch_size) -
+    fixed     - tx-blocks of exactly tx_block_capacity transactions, the leader waits for a full batch
+    max-wait  - tx_block_capacity transactions, or whatever is queued once tx_block_max_wait expires
+    adaptive  - tx-blocks grow with the backlog of the pool (up to tx_block_max_capacity), and the
+                leader waits at most a fraction of the observed voting latency for a full batch
+The policy is selected with "batching_policy" in params, either a single policy for all the shards
+or a list of policies assigned to the shards round-robin (to compare the policies in a single run).
+Without "batching_policy", the policy is 'max-wait' if tx_block_max_wait is set, else 'fixed'.
+"""
+
+
+BATCHING_POLICIES = ['fixed', 'max-wait', 'adaptive']
+
+
+class FixedBatchingPolicy:
+    def __init__(self, params):
+        self.capacity = params["tx_block_capacity"]
+
+    def get_trigger(self):
+        """
+        Return the number of transactions to wait for, and the max time to wait (None for no limit)
+        """
+        return self.capacity, None
+
+    def get_batch_size(self, queue_length):
+        return self.capacity
+
+    def record_voting_latency(self, latency):
+        pass
+
+
+class MaxWaitBatchingPolicy(FixedBatchingPolicy):
+    def __init__(self, params):
+        super().__init__(params)
+        self.max_wait = params.get("tx_block_max_wait")
+        if self.max_wait is None:
+            raise RuntimeError("'max-wait' batching policy requires tx_block_max_wait")
+
+    def get_trigger(self):
+        return self.capacity, self.max_wait
+
+
+class AdaptiveBatchingPolicy(FixedBatchingPolicy):
+    def __init__(self, params):
+        super().__init__(params)
+        self.max_capacity = max(params.get("tx_block_max_capacity", 4 * self.capacity), self.capacity)
+        self.max_wait = params.get("tx_block_max_wait")         # till the voting latency is observed
+        self.wait_factor = params.get("batching_wait_factor", 0.5)
+        self.smoothing = params.get("batching_smoothing", 0.2)
+        self.voting_latency = None                              # exponentially weighted moving average
+
+    def get_trigger(self):
+        if self.voting_latency is None:
+            return self.capacity, self.max_wait
+        return self.capacity, self.wait_factor * self.voting_latency
+
+    def get_batch_size(self, queue_length):
+        return min(max(queue_length, self.capacity), self.max_capacity)
+
+    def record_voting_latency(self, latency):
+        """
+        Record the time taken by a tx-block of the leader to be voted by the shard(s)
+        """
+        if self.voting_latency is None:
+            self.voting_latency = latency
+        else:
+            self.voting_latency += self.smoothing * (latency - self.voting_latency)
+
+
+def create_batching_policy(params, shard_id):
+    policy = params.get("batching_policy")
+    if policy is None:
+        policy = "fixed" if params.get("tx_block_max_wait") is None else "max-wait"
+    if isinstance(policy, list):
+        policy = policy[shard_id % len(policy)]
+
+    if policy == "fixed":
+        return FixedBatchingPolicy(params)
+    elif policy == "max-wait":
+        return MaxWaitBatchingPolicy(params)
+    elif policy == "adaptive":
+        return AdaptiveBatchingPolicy(params)
+    else:
+        raise RuntimeError(f"Unknown batching policy '{policy}', expected one of {BATCHING_POLICIES}")
@@ -1,20 +1,45 @@
+import itertools
+
+
 class Transaction:
     """
-    This class models a transaction
+    This class models a transaction.
+    Slotted to keep the per-transaction memory footprint small.
     """
 
-    def __init__(self, id, creation_time, value, reward, state, cross_shard_status):
+    __slots__ = ("id", "creation_time", "miningTime", "value", "reward", "cross_shard_status", "receiver", \
+                 "shard_id", "stage", "stage_time")
+
+    id_counter = itertools.count()
+
+    def __init__(self, id, creation_time, value, reward, cross_shard_status, shard_id=-1):
         self.id = id
         self.creation_time = creation_time
         self.miningTime = 0
         self.value = value
         self.reward = reward
-        self.state = {}
         self.cross_shard_status = cross_shard_status    # 0 - Intra-shard;  1 - Cross-shard
         self.receiver = None
+        self.shard_id = shard_id                        # Shard in which the transaction was generated
+        self.stage = -1                                 # Index of the last stage of processing reached (-1 for none)
+        self.stage_time = creation_time                 # Time when the last stage was first reached
+
+    @classmethod
+    def allocate_id(cls):
+        """
+        Return a new unique integer transaction id
+        """
+        return next(cls.id_counter)
+
+    @classmethod
+    def reset_ids(cls):
+        """
+        Restart the transaction ids from 0, for the next simulation in the same process
+        """
+        cls.id_counter = itertools.count()
 
     def display(self):
-        print(self.id)
+        print("T_%d" % self.id)
     
     def set_receiver(self, receiver_node_id):
-        self.receiver = receiver_node_id
\ No newline at end of file
+        self.receiver = receiver_node_id
@@ -2,8 +2,9 @@ import numpy as np
 
 from network.broadcast import broadcast
 from factory.transaction import Transaction
-from utils.helper import get_transmission_delay
 from utils.priority_queue import PriorityQueue
+from utils.seen_cache import create_seen_cache
+from utils.event_log import TX_ACCEPTED
 
 
 class TransactionPool:
@@ -19,9 +20,54 @@ class TransactionPool:
         self.nodes = nodes
         self.intra_shard_tx_queue = PriorityQueue()
         self.cross_shard_tx_queue = PriorityQueue()
-        self.prev_transactions = []
+        self.seen_transactions = create_seen_cache(params)
         self.intra_shard_tx = []
         self.cross_shard_tx = []
+        self.batch_waiters = { 'intra-shard': None, 'cross-shard': None }     # tx type -> (event, batch size)
+
+
+    def get_queue(self, tx_type):
+        if tx_type == 'intra-shard':
+            return self.intra_shard_tx_queue
+        elif tx_type == 'cross-shard':
+            return self.cross_shard_tx_queue
+        else:
+            raise RuntimeError("Unknown transaction type specified")
+
+
+    def batch_ready(self, tx_type, batch_size, max_wait=None):
+        """
+        Return an event which is triggered once batch_size transactions of the type are queued,
+        or max_wait after the call (if specified) - whichever happens first.
+        The value of the event is True if the batch is full.
+        """
+        event = self.env.event()
+        if self.get_queue(tx_type).length() >= batch_size:
+            return event.succeed(True)
+
+        self.batch_waiters[tx_type] = (event, batch_size)
+        if max_wait is not None:
+            deadline = self.env.timeout(max_wait)
+            deadline.callbacks.append(lambda _: self.trigger_batch_waiter(tx_type, event, False))
+        return event
+
+
+    def trigger_batch_waiter(self, tx_type, event, is_full):
+        waiter = self.batch_waiters[tx_type]
+        if waiter is None or waiter[0] is not event:
+            return
+
+        self.batch_waiters[tx_type] = None
+        event.succeed(is_full)
+
+
+    def notify_batch_waiter(self, tx_type):
+        """
+        Trigger the event of the waiting leader if the batch is full
+        """
+        waiter = self.batch_waiters[tx_type]
+        if waiter is not None and self.get_queue(tx_type).length() >= waiter[1]:
+            self.trigger_batch_waiter(tx_type, waiter[0], True)
 
 
     def get_transaction(self, transaction_count, tx_type):
@@ -50,38 +96,59 @@ class TransactionPool:
         else:
             raise RuntimeError("Unknown transaction type specified")
 
-        self.prev_transactions.append(popped_transactions)
+        for transaction in popped_transactions:
+            self.seen_transactions.add(transaction.id)
         return popped_transactions
 
 
-    def put_transaction(self, transaction, source_location, tx_type):
+    def drain(self):
+        """
+        Remove and return all the pending transactions (on reconfiguration of the network)
+        """
+        transactions = self.intra_shard_tx_queue.pop(self.intra_shard_tx_queue.length())
+        transactions += self.cross_shard_tx_queue.pop(self.cross_shard_tx_queue.length())
+
+        # Fresh queues drop the lazily removed entries as well
+        self.intra_shard_tx_queue = PriorityQueue()
+        self.cross_shard_tx_queue = PriorityQueue()
+        self.batch_waiters = { 'intra-shard': None, 'cross-shard': None }
+        return transactions
+
+
+    def add_pending_transactions(self, transactions):
         """
-        Add received transaction to the transaction pool and broadcast further
+        Add the transactions migrated from another pool, without broadcasting them
+        """
+        for transaction in transactions:
+            curr_queue = self.intra_shard_tx_queue if transaction.cross_shard_status == 0 else self.cross_shard_tx_queue
+            curr_queue.insert(transaction)
+            self.seen_transactions.add(transaction.id)
+
+        for tx_type in self.batch_waiters:
+            self.notify_batch_waiter(tx_type)
+
+
+    def add_transaction(self, transaction, tx_type):
+        """
+        Add the transaction (which has already reached this node) to the transaction pool and broadcast further
         """
         if not tx_type == 'intra-shard' and not tx_type == 'cross-shard':
             raise RuntimeError("Unknown transaction type specified")
 
-        dest_location = self.nodes[self.id].location
-        delay = get_transmission_delay(source_location, dest_location)
-
         curr_queue = self.intra_shard_tx_queue if tx_type == 'intra-shard' else self.cross_shard_tx_queue
-        yield self.env.timeout(delay)
         if (
-            not curr_queue.is_present(transaction)
-            and transaction not in self.prev_transactions
+            not self.seen_transactions.check_and_add(transaction.id)
+            and not curr_queue.is_present(transaction)
         ):
             curr_queue.insert(transaction)
+            self.notify_batch_waiter(tx_type)
 
             curr_node = self.nodes[self.id]
             neighbour_ids = [self.id if curr_node.next_hop_id == -1 else curr_node.next_hop_id]
             broadcast(self.env, transaction, "Tx", self.id, neighbour_ids, self.nodes, self.params)
             
             if self.params["verbose"]:
-                print(
-                    "%7.4f : %s accepted by %s"
-                    % (self.env.now, transaction.id, self.id)
-                )
+                curr_node.event_log.record(TX_ACCEPTED, self.id, transaction.id)
             
-            curr_node = self.nodes[self.id]
             # if curr_node.node_type == 2:
             #     print(f"Leader of the shard {curr_node.shard_id} is {self.id} and has {self.transaction_queue.length()} transactions")
\ No newline at end of file
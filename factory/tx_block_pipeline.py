@@ -0,0 +1,104 @@
+"""
+Pipeline of the tx-blocks of a shard leader, from being cut till they are batched into a mini-block.
+
+A tx-block (or cross-shard block) is in flight from the time the leader cuts it till it returns
+to the leader voted. The number of blocks in flight is bounded by "tx_block_pipeline_window" in
+params (None for no bound) - once the window is full the leader stops cutting new blocks till a
+block in flight is voted, so the backlog stays in the transaction pool instead of circulating in
+the shard as blocks to vote. The voted blocks are grouped "tx_blocks_in_mini_block" at a time
+into the mini-blocks. The blocks are indexed by their id, and the number of blocks in flight is
+reported to the metrics as the occupancy of the pipeline of the shard.
+"""
+
+from collections import deque
+
+
+class TxBlockPipeline:
+    def __init__(self, env, shard_id, params, metrics=None):
+        self.env = env
+        self.shard_id = shard_id
+        self.window = params.get("tx_block_pipeline_window")
+        self.group_size = params["tx_blocks_in_mini_block"]
+        self.metrics = metrics
+
+        self.in_flight = {}             # id of the block -> time it was cut
+        self.num_reserved = 0           # slots granted to the blocks being cut
+        self.slot_waiters = deque()     # events of the processes waiting for a free slot
+        self.voted = {}                 # id of the block -> voted block waiting for its mini-block
+        self.processed = set()          # ids of the blocks batched into the mini-blocks
+
+    def get_occupancy(self):
+        return len(self.in_flight)
+
+    def is_full(self):
+        return self.window is not None and len(self.in_flight) + self.num_reserved >= self.window
+
+    def acquire_slot(self):
+        """
+        Reserve a slot for the next block, returns None if a slot is free
+        or else an event which is triggered once a slot is reserved
+        """
+        if not self.slot_waiters and not self.is_full():
+            self.num_reserved += 1
+            return None
+
+        event = self.env.event()
+        self.slot_waiters.append(event)
+        return event
+
+    def add(self, block):
+        """
+        Record the block cut by the leader in the slot reserved for it
+        """
+        self.num_reserved = max(self.num_reserved - 1, 0)
+        self.in_flight[block.id] = self.env.now
+        self.record_occupancy()
+
+    def complete(self, block_id):
+        """
+        Release the slot of the block returned voted to the leader,
+        returns the time the block was cut (None if it isn't in flight)
+        """
+        cut_time = self.in_flight.pop(block_id, None)
+        if cut_time is None:
+            return None
+
+        while self.slot_waiters and not self.is_full():
+            self.num_reserved += 1
+            self.slot_waiters.popleft().succeed()
+        self.record_occupancy()
+        return cut_time
+
+    def add_voted(self, block):
+        """
+        Add the voted block to the next mini-block, returns the blocks
+        of the mini-block once the group is complete (else None)
+        """
+        if block.id in self.processed or block.id in self.voted:
+            return None
+
+        self.voted[block.id] = block
+        if len(self.voted) < self.group_size:
+            return None
+
+        block_ids = list(self.voted)[ : self.group_size]
+        self.processed.update(block_ids)
+        return [ self.voted.pop(block_id) for block_id in block_ids ]
+
+    def is_processed(self, block_id):
+        return block_id in self.processed
+
+    def close(self):
+        """
+        Drop the blocks in flight, as the leader is retired on reconfiguration of the network
+        """
+        self.in_flight = {}
+        self.slot_waiters.clear()
+        self.record_occupancy()
+
+    def record_occupancy(self):
+        if self.metrics is not None:
+            occupancy = self.get_occupancy()
+            self.metrics.record_pipeline_occupancy(
+                self.shard_id, occupancy, self.window is not None and occupancy >= self.window
+            )
@@ -11,8 +11,9 @@ class Block:
     update the state of the Blockchain maintained by the nodes.
     """
 
-    def __init__(self, id, transactions_list, params):
+    def __init__(self, id, transactions_list, params, epoch=0):
         self.params = params
         self.id = id
+        self.epoch = epoch          # Epoch in which the block was generated
         self.transactions_list = transactions_list
         self.hash = self.id + "_" + generate_hash(10)
\ No newline at end of file
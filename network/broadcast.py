@@ -1,45 +1,72 @@
 from network.packet import Packet
+from network.message_size import get_message_size
+from utils.event_log import TX_BROADCASTED, BLOCK_PROPAGATED
+
+
+def fan_out(env, payload, recipients, delays, deliver):
+    """
+    Schedule the delivery of a shared payload to every recipient after its delay.
+    Recipients with the same delay are delivered by a single event, and no
+    SimPy process is created per recipient.
+    """
+    batches = {}
+    for recipient, delay in zip(recipients, delays):
+        batches.setdefault(float(delay), []).append(recipient)
+
+    def make_callback(batch):
+        def callback(event):
+            for recipient in batch:
+                deliver(recipient, payload)
+        return callback
+
+    events = []
+    for delay, batch in batches.items():
+        event = env.timeout(delay)
+        event.callbacks.append(make_callback(batch))
+        events.append(event)
+
+    return events
+
 
 def broadcast(env, object, object_type, source, neighbour_list, nodes, params):
     """
     Broadcast the object from the source to destination
     """
     if neighbour_list:
+        nodes[source].metrics.record_messages(object_type, get_message_size(object), len(neighbour_list))
+
         if object_type == "Tx":
             tx_type = 'intra-shard' if object.cross_shard_status == 0 else 'cross-shard'
             # Broadcast a transaction to all neighbours
-            for neighbour in neighbour_list:
-                env.process(
-                    nodes[neighbour].transaction_pool.put_transaction(object, nodes[source].location, tx_type)
-                )
+            pools = [ nodes[neighbour].transaction_pool for neighbour in neighbour_list ]
+            delays = nodes[source].latency_model.get_delays(
+                nodes[source].location, [ nodes[neighbour].location for neighbour in neighbour_list ]
+            )
+            events = fan_out(env, object, pools, delays, lambda pool, tx: pool.add_transaction(tx, tx_type))
             
             if params["verbose"]:
-                print(
-                    "%7.4f" % env.now
-                    + " : "
-                    + "%s added to tx-pool of %s"
-                    % (object.id, neighbour_list)
-                )
+                nodes[source].event_log.record(TX_BROADCASTED, source, object.id, neighbour_list)
+
+            return events
 
         else:
             # Broadcast Block to the network
             # OR Broadcast Tx-block to the shard nodes
             # OR Broadcast Mini-block to the Principal Committee members
             # OR Intra-committee broadcast Mini-block between the Principal Committee members
-            events = []
-            for neighbour in neighbour_list:
-                source_location = nodes[neighbour].location
-                packeted_object = Packet(source, object, neighbour)
-                store = nodes[neighbour].pipes
-                events.append(store.put_data(packeted_object, source_location))
+            # The packet is shared by all the neighbours, the receiving pipe identifies the recipient
+            packeted_object = Packet(source, object, epoch=nodes[source].epoch)
+            pipes = [ nodes[neighbour].pipes for neighbour in neighbour_list ]
+            locations = [ nodes[neighbour].location for neighbour in neighbour_list ]
+            delays = nodes[source].latency_model.get_delays(nodes[source].location, locations)
+
+            if pipes[0].mode == "process":
+                events = [ pipe.put_data(packeted_object, None, delay) for pipe, delay in zip(pipes, delays) ]
+            else:
+                events = fan_out(env, packeted_object, pipes, delays, lambda pipe, packet: pipe.deliver(packet))
 
             if params["verbose"]:
                 debug_info = "Mini-block-voting-list" if isinstance(object, list) else object.id
-                print(
-                    "%7.4f" % env.now
-                    + " : "
-                    + "Node %s propagated %s %s to its neighbours %s" % (source, object_type, debug_info, neighbour_list)
-                )
+                nodes[source].event_log.record(BLOCK_PROPAGATED, source, debug_info, object_type, neighbour_list)
                 
-            return env.all_of(events)
-        
\ No newline at end of file
+            return events
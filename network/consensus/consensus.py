@@ -3,21 +3,28 @@ from scipy.stats import norm
 
 
 class Consensus:
-    def __init__(self, mu, sigma):
+    def __init__(self, mu, sigma, sampler=None):
         self._mu = mu
         self._sigma = sigma
+        self._sampler = sampler
 
     def set_consensus_params(self, mu, sigma):
         self._mu = mu
         self._sigma = sigma     
 
     def get_random_number(self):
+        if self._sampler is not None:
+            return self._mu + self._sigma * self._sampler.standard_normal(1)[0]
         return self._mu + self._sigma * np.random.randn()
 
     def get_consensus_time(self):
+        # delay = N(mu, sigma) + 1, truncated at 0
+        if self._sampler is not None:
+            return self._sampler.sample(self._mu + 1, self._sigma)
+
         delay = self.get_random_number() + 1
-        if delay < 0:
-            return self.get_consensus_time()
+        while delay < 0:
+            delay = self.get_random_number() + 1
         return delay
     
     def get_consensus_probability(self):
@@ -1,4 +1,5 @@
 from network.block import Block
+from network.vote_matrix import VoteMatrix
 
 
 class CrossShardBlock(Block):
@@ -7,8 +8,8 @@ class CrossShardBlock(Block):
     the other shard leaders.
     """
 
-    def __init__(self, id, transactions_list, params, shard_id, shard_nodes):
-        super().__init__(id, transactions_list, params)
+    def __init__(self, id, transactions_list, params, shard_id, shard_nodes, epoch=0):
+        super().__init__(id, transactions_list, params, epoch)
         self.id = id
         self.originating_shard_id = shard_id
         self.shard_votes_status = {}
@@ -19,13 +20,12 @@ class CrossShardBlock(Block):
     def add_shard_info_for_voting(self, shard_id, shard_nodes):
         """
         Adds initial shard info in preparation of voting -
-            Initialisation of the dict containing vote of each node for every tx as -1
+            Initialisation of the vote matrix of the shard with vote of each node for every tx as -1
         """
 
-        self.shard_votes_status[shard_id] = {}
-
         if shard_id == self.originating_shard_id:
             # cross-shard tx doesn't require voting from current shard
+            self.shard_votes_status[shard_id] = VoteMatrix([], [])
             return
 
         """
@@ -33,8 +33,4 @@ class CrossShardBlock(Block):
         (compared to the Tx-block)
         """
 
-        for tx in self.transactions_list:
-            self.shard_votes_status[shard_id][tx.id] = {}
-            for node_id in shard_nodes:
-                self.shard_votes_status[shard_id][tx.id][node_id] = -1
-                # -1 means votes has not been casted
\ No newline at end of file
+        self.shard_votes_status[shard_id] = VoteMatrix([ tx.id for tx in self.transactions_list ], shard_nodes)
\ No newline at end of file
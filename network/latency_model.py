@@ -0,0 +1,73 @@
+import numpy as np
+
+from utils.delay_sampler import DelaySampler
+
+
+class LatencyModel:
+    """
+    This class models the link latency between the locations of the nodes.
+    It is built once from the loaded params and caches the delay matrix as
+    NumPy arrays indexed by integer location codes.
+    """
+
+    def __init__(self, params, sampler=None):
+        self.locations = list(params["locations"])
+        self.location_codes = { location: idx for idx, location in enumerate(self.locations) }
+
+        num_locations = len(self.locations)
+        self.mu = np.zeros((num_locations, num_locations))
+        self.sigma = np.zeros((num_locations, num_locations))
+
+        for source, source_idx in self.location_codes.items():
+            for destination, destination_idx in self.location_codes.items():
+                self.mu[source_idx][destination_idx] = params["delay"][source][destination]["mu"]
+                self.sigma[source_idx][destination_idx] = params["delay"][source][destination]["sigma"]
+
+        # Pre-drawn samples are handed out by the sampler, refilled in bulk when exhausted
+        self.sampler = sampler if sampler is not None else DelaySampler()
+
+
+    def get_location_code(self, location):
+        """
+        Return the integer code of the location (codes are returned as it is)
+        """
+        if isinstance(location, str):
+            return self.location_codes[location]
+        return location
+
+
+    def get_delay(self, source, destination):
+        """
+        Return the transmission delay of a link from source to destination location
+        """
+        source_idx = self.get_location_code(source)
+        destination_idx = self.get_location_code(destination)
+        return self.sampler.sample(self.mu[source_idx][destination_idx], self.sigma[source_idx][destination_idx])
+
+
+    def get_mean_delay(self, source, destination):
+        """
+        Return the expected transmission delay of a link from source to destination location
+        """
+        return self.mu[self.get_location_code(source)][self.get_location_code(destination)]
+
+
+    def get_delays(self, sources, destinations):
+        """
+        Return the transmission delays of a batch of links.
+        sources can either be a single location or a location per destination.
+        """
+        if isinstance(sources, (list, tuple, np.ndarray)):
+            source_idx = np.array([ self.get_location_code(src) for src in sources ], dtype=int)
+        else:
+            source_idx = self.get_location_code(sources)
+        destination_idx = np.array([ self.get_location_code(dest) for dest in destinations ], dtype=int)
+        mu = self.mu[source_idx, destination_idx]
+        sigma = self.sigma[source_idx, destination_idx]
+
+        delays = mu + sigma * self.sampler.standard_normal(len(destination_idx))
+        rejected = delays < 0
+        while rejected.any():
+            delays[rejected] = mu[rejected] + sigma[rejected] * self.sampler.standard_normal(int(rejected.sum()))
+            rejected = delays < 0
+        return delays
@@ -0,0 +1,53 @@
+"""
+Estimated size (in bytes) of the messages exchanged by the nodes, to account for the bandwidth used.
+
+The sizes follow a simple wire format -
+    transaction     - TX_SIZE bytes
+    vote            - VOTE_SIZE byte per transaction per node, along with the id of the node
+    tx-block        - header, transactions and the votes casted so far (the votes of a node are
+                      carried only once it has voted), cross-shard block the votes of every shard
+    mini-block / block - header and transactions
+    vote aggregate  - header, ids of the nodes and their votes
+A list of messages (e.g. votes on the mini-blocks) is the sum of its messages.
+The latency model doesn't depend on the size, so the sizes are only reported in the metrics.
+"""
+
+import numpy as np
+
+from factory.transaction import Transaction
+from network.block import Block
+from network.tx_block import TxBlock
+from network.cross_shard_block import CrossShardBlock
+from network.mini_block import MiniBlockVote
+from network.vote_aggregate import VoteAggregate
+
+
+HEADER_SIZE = 80
+ID_SIZE = 32
+TX_SIZE = 250
+VOTE_SIZE = 1
+
+
+def get_votes_size(vote_matrix):
+    num_voters = int(np.count_nonzero(vote_matrix.voted))
+    return num_voters * (ID_SIZE + VOTE_SIZE * len(vote_matrix.tx_ids))
+
+
+def get_message_size(message):
+    if isinstance(message, Transaction):
+        return TX_SIZE
+    if isinstance(message, list):
+        return sum(get_message_size(item) for item in message)
+    if isinstance(message, MiniBlockVote):
+        return ID_SIZE + VOTE_SIZE
+    if isinstance(message, VoteAggregate):
+        return HEADER_SIZE + len(message.node_ids) * ID_SIZE + message.votes.size * VOTE_SIZE
+
+    size = HEADER_SIZE
+    if isinstance(message, Block):
+        size += len(message.transactions_list) * TX_SIZE
+    if isinstance(message, TxBlock):
+        size += get_votes_size(message.votes_status)
+    elif isinstance(message, CrossShardBlock):
+        size += sum(get_votes_size(vote_matrix) for vote_matrix in message.shard_votes_status.values())
+    return size
@@ -7,11 +7,24 @@ class MiniBlock(Block):
     the Principal Committee for the final verification.
     """
 
-    def __init__(self, id, transactions_list, params, shard_id, generation_time):
-        super().__init__(id, transactions_list, params)
+    def __init__(self, id, transactions_list, params, shard_id, generation_time, epoch=0):
+        super().__init__(id, transactions_list, params, epoch)
 
         self.shard_id = shard_id
         self.publisher_info = {}
         # self.message_data = []
         self.message_data = {}
-        self.generation_time = generation_time
\ No newline at end of file
+        self.generation_time = generation_time
+
+
+class MiniBlockVote:
+    """
+    This class models the vote of a principal committee node on a mini-block.
+    It is sent to the principal committee leader instead of a copy of the whole mini-block.
+    """
+
+    __slots__ = ("id", "vote")
+
+    def __init__(self, id, vote):
+        self.id = id
+        self.vote = vote
@@ -5,8 +5,14 @@ import random
 from nodes.participating_node import ParticipatingNode
 from nodes.full_node import FullNode
 from network.pipe import Pipe
+from network.latency_model import LatencyModel
+from network.network_index import NetworkIndex
+from network.topology import build_topology, get_dense_neighbours
+from network.routing import ShardRoutes
+from utils.delay_sampler import DelaySampler
+from utils.metrics import MetricsCollector
+from utils.event_log import EventLog
 from utils.spanning_tree import SpanningTree
-from utils.helper import assign_next_hop_to_leader
 
 
 class Network:
@@ -14,7 +20,7 @@ class Network:
     This class models the backbone of the entire blockchain network.
     """
 
-    def __init__(self, name, env, params):
+    def __init__(self, name, env, params, event_log=None):
         self.name = name
         self.env = env
         self.params = params
@@ -25,6 +31,15 @@ class Network:
         self.shard_nodes = []
         self.pipes = {}
         self.num_nodes = params['num_nodes']
+        self.epoch = -1
+        self.leader_pc_neighbours = {}      # shard leader id -> its principal committee neighbours
+        self.leader_neighbours = {}         # shard leader id -> neighbouring shard leaders
+
+        # Root of the seed streams; derived from the global seed to keep runs reproducible
+        self.delay_sampler = DelaySampler(np.random.randint(2**32))
+        self.latency_model = LatencyModel(params, self.delay_sampler.spawn(0))
+        self.metrics = MetricsCollector(env, params)
+        self.event_log = event_log if event_log else EventLog(env)
         self.add_participating_nodes(params["num_nodes"])
 
 
@@ -72,7 +87,11 @@ class Network:
                     "FN%d" % curr_id,
                     curr_participating_node.env,
                     curr_participating_node.location,
-                    curr_participating_node.params
+                    curr_participating_node.params,
+                    self.latency_model,
+                    self.delay_sampler.spawn(1, curr_id),
+                    self.metrics,
+                    self.event_log
                 )
 
                 if bool(self.params["verbose"]):
@@ -87,26 +106,106 @@ class Network:
                 pass
 
 
+    def start_epochs(self):
+        """
+        Execute the first epoch right away and schedule the reconfiguration of the network
+        for the rest of the epochs, which evenly split the simulation time
+        """
+        self.run_epoch()
+        if self.params["num_epochs"] > 1:
+            self.env.process(self.schedule_epochs())
+
+
+    def schedule_epochs(self):
+        epoch_duration = self.params["simulation_time"] / self.params["num_epochs"]
+        for _ in range(1, self.params["num_epochs"]):
+            yield self.env.timeout(epoch_duration)
+            self.run_epoch()
+
+
     def run_epoch(self):
         """
         Start executing a fresh epoch
         """
+        self.epoch += 1
+        pending_transactions = self.retire_epoch()
 
         self.params["network_config_start_time"] = self.env.now
-        self.partition_nodes()
-        self.establish_network_connections()
+        reshuffle_fraction = self.params.get("epoch_reshuffle_fraction", 1.0)
+        if self.epoch == 0 or reshuffle_fraction >= 1:
+            self.partition_nodes()
+            self.establish_network_connections()
+        else:
+            for idx in self.reshuffle_shard_members(reshuffle_fraction):
+                self.connect_shard_nodes(idx)
+                leader = self.get_shard_leader(idx)
+                leader.neighbours_ids += self.leader_neighbours[leader.id]
+        self.build_network_index()
+        self.migrate_transactions(pending_transactions)
 
         self.params["tx_start_time"] = self.env.now
         self.allow_transactions_generation()
         self.display_network_info()
 
 
+    def retire_epoch(self):
+        """
+        Retire the processes of the previous epoch on every node and collect the
+        transactions pending in the pools of the shard leaders, keyed by the shard
+        """
+        pending_transactions = {}
+        for node in self.full_nodes.values():
+            if node.transaction_pool is not None:
+                transactions = node.transaction_pool.drain()
+                if node.node_type == 2:
+                    pending_transactions[node.shard_id] = transactions
+            node.leave_epoch(self.epoch)
+
+        return pending_transactions
+
+
+    def migrate_transactions(self, pending_transactions):
+        """
+        Hand over the pending transactions of every shard to its (new) leader
+        """
+        for shard_id, transactions in pending_transactions.items():
+            self.get_shard_leader(shard_id).transaction_pool.add_pending_transactions(transactions)
+
+
+    def reshuffle_shard_members(self, fraction):
+        """
+        Move the given fraction of the shard members (excluding leaders) across the shards,
+        keeping the size of the shards intact. Returns the ids of the shards whose membership changed.
+        """
+        members = [ node_id for shard in self.shard_nodes for node_id in shard if self.full_nodes[node_id].node_type == 3 ]
+        moved_members = np.random.choice(members, size=int(len(members) * fraction), replace=False).tolist()
+        new_shard_ids = np.random.permutation([ self.full_nodes[node_id].shard_id for node_id in moved_members ])
+
+        leader_ids = [ self.get_shard_leader(idx).id for idx in range(len(self.shard_nodes)) ]
+        changed_shards = set()
+        for node_id, shard_id in zip(moved_members, new_shard_ids.tolist()):
+            node = self.full_nodes[node_id]
+            if node.shard_id == shard_id:
+                continue
+
+            changed_shards.update([node.shard_id, shard_id])
+            self.shard_nodes[node.shard_id].remove(node_id)
+            self.shard_nodes[shard_id].append(node_id)
+            node.shard_id = shard_id
+            node.shard_leader_id = leader_ids[shard_id]
+
+        return sorted(changed_shards)
+
+
     def partition_nodes(self):
         """
         Partititon the nodes in the network into principal committee, leaders
         and shard members
         """
 
+        for node in self.full_nodes.values():
+            node.reset_role()
+
         # Add members to the Principal Committee randomly
         nodes = list(self.full_nodes.keys())
         np.random.shuffle(nodes)
@@ -195,6 +294,7 @@ class Network:
             )
 
             curr_leader.add_network_parameters(self.full_nodes, neighbours_list)
+            self.leader_pc_neighbours[curr_leader.id] = list(neighbours_list)
             
             # Add back connections to the principal committee neighbours
             for id in neighbours_list:
@@ -202,64 +302,72 @@ class Network:
 
         ################## Connect the shard nodes with each other and the leaders ##################
         for idx in range(len(self.shard_nodes)):
-            curr_shard_nodes = {}
-            for node_id in self.shard_nodes[idx]:
-                curr_shard_nodes[node_id] = self.full_nodes[node_id]
+            self.connect_shard_nodes(idx)
 
-            neighbours_info = {}
-            degree = len(self.shard_nodes[idx]) // 2 + 1
+        self.connect_shard_leaders()
 
-            for curr_node_id in self.shard_nodes[idx]:
-                possible_neighbours = self.shard_nodes[idx].copy()
-                possible_neighbours.remove(curr_node_id)
-            
-                neighbours_list = np.random.choice(
-                    possible_neighbours, size=degree, replace=False
-                )
 
-                if curr_node_id not in neighbours_info.keys():
-                    neighbours_info[curr_node_id] = set()
-                
-                for neighbour_id in neighbours_list:
-                    if neighbour_id not in neighbours_info.keys():
-                        neighbours_info[neighbour_id] = set()
+    def connect_shard_nodes(self, idx):
+        """
+        Connect the nodes of the shard with each other and the leader (can be re-done independently for every shard)
+        """
+        curr_shard_nodes = {}
+        for node_id in self.shard_nodes[idx]:
+            curr_shard_nodes[node_id] = self.full_nodes[node_id]
+
+        if self.params.get("topology_model", "dense") == "dense":
+            neighbours_info = get_dense_neighbours(self.shard_nodes[idx])
+        else:
+            locations = [ self.full_nodes[node_id].location for node_id in self.shard_nodes[idx] ]
+            topology = build_topology(self.shard_nodes[idx], locations, self.params, self.latency_model)
+            neighbours_info = topology.get_neighbours_ids()
+
+        for curr_node_id in self.shard_nodes[idx]:
+            self.full_nodes[curr_node_id].shard_leader = self.get_shard_leader(idx)
+        
+        principal_committee_neigbours = []
+        for key, value in neighbours_info.items():
+            if self.full_nodes[key].node_type == 2:
+                # If curr_node is a leader, append to the neighbors list
+                principal_committee_neigbours = self.leader_pc_neighbours[key]
+                self.full_nodes[key].update_neighbours(list(value))
+            else:
+                self.full_nodes[key].add_network_parameters(curr_shard_nodes, list(value))
+        
+        # Create a Spanning Tree for the broadcast for the shard nodes
+        spanning_tree_type = self.params.get("spanning_tree", "unweighted")
+        if spanning_tree_type == "unweighted":
+            neighbours_info = SpanningTree(curr_shard_nodes).Kruskal_MST()
+        elif spanning_tree_type == "latency":
+            neighbours_info = SpanningTree(curr_shard_nodes, self.latency_model).Kruskal_MST()
+        elif spanning_tree_type == "min-depth":
+            spanning_tree = SpanningTree(curr_shard_nodes, self.latency_model)
+            neighbours_info = spanning_tree.min_depth_tree(self.get_shard_leader(idx).id)
+        else:
+            raise RuntimeError(f"Unknown spanning tree '{spanning_tree_type}', expected 'unweighted', 'latency' or 'min-depth'")
+        
+        # Make edges bi-directional
+        for id, neighbours in neighbours_info.items():
+            for neighbour_id in list(neighbours):
+                neighbours_info[neighbour_id].add(id)
 
-                    neighbours_info[curr_node_id].add(neighbour_id)
-                    neighbours_info[neighbour_id].add(curr_node_id)
-                
-                self.full_nodes[curr_node_id].shard_leader = self.get_shard_leader(idx)
-            
-            principal_committee_neigbours = []
-            for key, value in neighbours_info.items():
-                if self.full_nodes[key].node_type == 2:
-                    # If curr_node is a leader, append to the neighbors list
-                    principal_committee_neigbours = self.full_nodes[key].neighbours_ids
-                    self.full_nodes[key].update_neighbours(list(value))
-                else:
-                    self.full_nodes[key].add_network_parameters(curr_shard_nodes, list(value))
-            
-            # Create a Spanning Tree for the broadcast for the shard nodes
-            spanning_tree = SpanningTree(curr_shard_nodes)
-            neighbours_info = spanning_tree.Kruskal_MST()
-            
-            # Make edges bi-directional
-            for id, neighbours in neighbours_info.items():
-                for neighbour_id in list(neighbours):
-                    neighbours_info[neighbour_id].add(id)
-
-            # Update the neighbours
-            for key, value in neighbours_info.items():
-                # print(f"{key} -- {self.full_nodes[key].neighbours_ids}")
-                value = list(value)
-                if self.full_nodes[key].node_type == 2:
-                    value += list(principal_committee_neigbours)
-                self.full_nodes[key].update_neighbours(value)
-            
-            # Assign next_hop to reach the leader
-            assign_next_hop_to_leader(curr_shard_nodes, self.get_shard_leader(idx))
-            # for id, node in curr_shard_nodes.items():
-            #     print(f"{id} = {node.next_hop_id}")
+        # Update the neighbours
+        for key, value in neighbours_info.items():
+            # print(f"{key} -- {self.full_nodes[key].neighbours_ids}")
+            value = list(value)
+            if self.full_nodes[key].node_type == 2:
+                value += list(principal_committee_neigbours)
+            self.full_nodes[key].update_neighbours(value)
+        
+        # Assign next_hop to reach the leader, from the routing table of the shard
+        shard_routes = ShardRoutes(curr_shard_nodes, self.get_shard_leader(idx).id)
+        for node_id, next_hop_id in shard_routes.get_next_hops_to_leader().items():
+            self.full_nodes[node_id].next_hop_id = next_hop_id
+        # for id, node in curr_shard_nodes.items():
+        #     print(f"{id} = {node.next_hop_id}")
 
+
+    def connect_shard_leaders(self):
         """
         Cross-shard Transactions -
             Connect shard leaders with each other
@@ -295,9 +403,19 @@ class Network:
         
         for id in leaders_id_list:
             self.full_nodes[id].init_shard_leaders(leader_nodes)
-            self.full_nodes[id].neighbours_ids += (list(neighbours_info[id]))
+            self.leader_neighbours[id] = list(neighbours_info[id])
+            self.full_nodes[id].neighbours_ids += self.leader_neighbours[id]
             
 
+    def build_network_index(self):
+        """
+        Build the per-epoch topology indexes and share them with all the full nodes
+        """
+        self.network_index = NetworkIndex(self.full_nodes, self.principal_committee_node_ids, self.shard_nodes)
+        for node in self.full_nodes.values():
+            node.network_index = self.network_index
+
+
     def get_shard_leader(self, idx):
         """
         Return leader of the specified shard
@@ -324,11 +442,11 @@ class Network:
                 #     curr_node.env.process(curr_node.preprocess_cross_shard_transactions())
                 #     continue
                 
-                curr_node.env.process(curr_node.generate_transactions())
+                curr_node.start_process(curr_node.generate_transactions())
                 if curr_node.node_type == 2:
                     # curr_node.env.process(curr_node.preprocess_transactions())
-                    curr_node.env.process(curr_node.preprocess_intra_shard_transactions())
-                    curr_node.env.process(curr_node.preprocess_cross_shard_transactions())
+                    curr_node.start_process(curr_node.preprocess_intra_shard_transactions())
+                    curr_node.start_process(curr_node.preprocess_cross_shard_transactions())
                     
 
     def display_network_info(self):
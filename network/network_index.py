@@ -0,0 +1,37 @@
+from types import MappingProxyType
+
+
+class NetworkIndex:
+    """
+    This class models the read-only indexes of the network topology for an epoch,
+    so that the nodes can look up their shard and committee relations in O(1)
+    instead of filtering their neighbours on every message.
+    It is rebuilt by the Network whenever the nodes are partitioned again.
+    """
+
+    def __init__(self, full_nodes, principal_committee_node_ids, shard_nodes):
+        self.principal_committee = frozenset(principal_committee_node_ids)
+
+        shard_members, shard_member_set, shard_voters, shard_leaders = {}, {}, {}, {}
+        for shard_id, node_ids in enumerate(shard_nodes):
+            shard_members[shard_id] = tuple(node_ids)
+            shard_member_set[shard_id] = frozenset(node_ids)
+            shard_voters[shard_id] = tuple(id for id in node_ids if full_nodes[id].node_type == 3)
+            shard_leaders[shard_id] = full_nodes[node_ids[0]].shard_leader_id
+
+        shard_neighbours, principal_committee_neighbours = {}, {}
+        for node_id, node in full_nodes.items():
+            shard_neighbours[node_id] = tuple(
+                id for id in node.neighbours_ids
+                if full_nodes[id].shard_id == node.shard_id and full_nodes[id].node_type in (2, 3)
+            )
+            principal_committee_neighbours[node_id] = tuple(
+                id for id in node.neighbours_ids if full_nodes[id].node_type == 1
+            )
+
+        self.shard_members = MappingProxyType(shard_members)                        # shard -> node ids (incl. leader)
+        self.shard_member_set = MappingProxyType(shard_member_set)                  # shard -> set of node ids
+        self.shard_voters = MappingProxyType(shard_voters)                          # shard -> node ids (excl. leader)
+        self.shard_leaders = MappingProxyType(shard_leaders)                        # shard -> leader id
+        self.shard_neighbours = MappingProxyType(shard_neighbours)                  # node -> neighbours in its shard
+        self.principal_committee_neighbours = MappingProxyType(principal_committee_neighbours)     # node -> p.c. neighbours
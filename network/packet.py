@@ -2,9 +2,13 @@ class Packet:
     """
     This class models a wrapper for the exchange of the blocks, mini-blocks and tx-blocks.
     The wrapper wraps the underlying message with the other necessary information.
+    A packet is shared by all the recipients of a broadcast, so it must not be modified.
     """
 
-    def __init__(self, sender, message, receiver):
+    __slots__ = ("sender_id", "message", "receiver_id", "epoch")
+
+    def __init__(self, sender, message, receiver=None, epoch=0):
         self.sender_id = sender
         self.message = message
-        self.receiver_id = receiver
\ No newline at end of file
+        self.receiver_id = receiver
+        self.epoch = epoch              # Epoch in which the packet was sent
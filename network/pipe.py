@@ -1,26 +1,49 @@
 import simpy
-from utils.helper import get_transmission_delay
 
 
 class Pipe(object):
     """
     This class represents the propagation of data through a cable.
+    Delivery modes -
+        "event"   - delivery is scheduled directly as a timed event callback (default)
+        "process" - a SimPy process is spawned per message to wait and then deliver
     """
 
-    def __init__(self, env, id, all_nodes):
+    def __init__(self, env, id, all_nodes, latency_model, mode="event"):
+        if mode not in ("event", "process"):
+            raise RuntimeError(f"Unknown pipe mode '{mode}' specified")
+
         self.env = env
         self.id = id
         self.all_nodes = all_nodes
+        self.latency_model = latency_model
+        self.mode = mode
         self.store = simpy.Store(self.env)
 
     def put_data_with_latency(self, value, delay):
         yield self.env.timeout(delay)
         return self.store.put(value)
 
-    def put_data(self, value, source_location):
-        dest_location = self.all_nodes[self.id].location
-        delay = get_transmission_delay(source_location, dest_location)
-        return self.env.process(self.put_data_with_latency(value, delay))
+    def put_data(self, value, source_location, delay=None):
+        if delay is None:
+            dest_location = self.all_nodes[self.id].location
+            delay = self.latency_model.get_delay(source_location, dest_location)
+
+        if self.mode == "process":
+            return self.env.process(self.put_data_with_latency(value, delay))
+
+        event = self.env.timeout(delay, value)
+        event.callbacks.append(self.on_arrival)
+        return event
+
+    def on_arrival(self, event):
+        self.store.put(event.value)
+
+    def deliver(self, value):
+        """
+        Deliver the value right away (latency already accounted for by the sender)
+        """
+        return self.store.put(value)
 
     def get(self):
         return self.store.get()
\ No newline at end of file
@@ -0,0 +1,32 @@
+from utils.graph_algorithms import get_adjacency, bfs_parents
+
+
+class ShardRoutes:
+    """
+    This class models the routing table of a shard towards its leader - the next hop of every
+    member on a shortest path to the leader, over the (bidirectional) links between the members.
+    The nodes are mapped to integer indices, and the next hops are the parents in the BFS tree
+    rooted at the leader.
+    """
+
+    def __init__(self, nodes, leader_id):
+        self.node_ids = list(nodes)
+        self.index = { node_id: idx for idx, node_id in enumerate(self.node_ids) }
+        self.leader_id = leader_id
+
+        sources, destinations = [], []
+        for node_id, node in nodes.items():
+            for neighbour_id in node.neighbours_ids:
+                if neighbour_id in self.index:          # else neighbour is a principal committee node
+                    sources.append(self.index[node_id])
+                    destinations.append(self.index[neighbour_id])
+
+        indptr, indices, _ = get_adjacency(len(self.node_ids), sources, destinations)
+        self.table = bfs_parents(len(self.node_ids), indptr, indices, self.index[leader_id]).tolist()     # -1 if none
+
+    def get_next_hops_to_leader(self):
+        """
+        Return node id -> next hop towards the leader, for all the members other than the leader
+        (and the members which can't reach it)
+        """
+        return { node_id: self.node_ids[hop] for node_id, hop in zip(self.node_ids, self.table) if hop >= 0 }
@@ -0,0 +1,256 @@
+"""
+Generators of the network topology between the nodes of a shard.
+
+The "dense" model is the original random graph of degree n/2 + 1, which grows
+quadratically with the size of the shard. The other models are sparse graphs of
+a configurable degree, sampled with vectorized operations over the integer
+indices 0..n-1 of the nodes and returned in CSR form, so the topology of a
+network of 10k nodes can be built in a fraction of a second -
+    random-regular  - union of random Hamiltonian cycles (+ a random matching for an odd degree)
+    small-world     - Watts-Strogatz ring lattice with the long links rewired at random
+    geographic      - k nearest nodes by the expected link latency between the locations
+All the sparse models include a Hamiltonian cycle, hence the graphs are always connected.
+"""
+
+import numpy as np
+
+
+TOPOLOGY_MODELS = ['dense', 'random-regular', 'small-world', 'geographic']
+
+
+class Topology:
+    """
+    This class models an undirected graph in CSR form - the neighbours of the
+    node at index i are node_ids[indices[indptr[i] : indptr[i + 1]]]
+    """
+
+    def __init__(self, node_ids, indptr, indices):
+        self.node_ids = np.asarray(node_ids)
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_edges(cls, node_ids, sources, destinations):
+        """
+        Build the graph from the edges between the indices of the nodes, dropping self-loops and duplicate edges
+        """
+        num_nodes = len(node_ids)
+        sources = np.asarray(sources, dtype=np.int64)
+        destinations = np.asarray(destinations, dtype=np.int64)
+
+        # Add both the directions and sort by (source, destination) through a combined key
+        all_sources = np.concatenate([sources, destinations])
+        all_destinations = np.concatenate([destinations, sources])
+        keep = all_sources != all_destinations
+        keys = np.unique(all_sources[keep] * num_nodes + all_destinations[keep])
+
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // num_nodes, minlength=num_nodes), out=indptr[1:])
+        return cls(node_ids, indptr, keys % num_nodes)
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.indices) // 2
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def neighbours(self, idx):
+        """
+        Return the indices of the neighbours of the node at index idx
+        """
+        return self.indices[self.indptr[idx] : self.indptr[idx + 1]]
+
+    def edges(self):
+        """
+        Return the undirected edges as arrays of (source, destination) indices, with source < destination
+        """
+        sources = np.repeat(np.arange(self.num_nodes), self.degrees())
+        mask = sources < self.indices
+        return sources[mask], self.indices[mask]
+
+    def get_neighbours_ids(self):
+        """
+        Return the neighbours of every node as node id -> list of node ids
+        """
+        node_ids = self.node_ids.tolist()
+        neighbours = self.node_ids[self.indices].tolist()
+        indptr = self.indptr.tolist()
+        return { node_ids[idx]: neighbours[indptr[idx] : indptr[idx + 1]] for idx in range(self.num_nodes) }
+
+    def is_connected(self):
+        """
+        Breadth-first search from the first node, expanding the whole frontier at once
+        """
+        if self.num_nodes == 0:
+            return True
+
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        visited[0] = True
+        frontier = np.array([0])
+        while frontier.size:
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            neighbours = self.indices[np.repeat(starts, counts) + offsets]
+            frontier = np.unique(neighbours[~visited[neighbours]])
+            visited[frontier] = True
+        return bool(visited.all())
+
+
+def get_cycle_edges(order):
+    """
+    Return the edges of the cycle through the nodes in the given order
+    """
+    return order, np.roll(order, -1)
+
+
+def get_random_integers(rng, high, size):
+    """
+    Return uniform integers in [0, high) - works with np.random as well as a Generator
+    """
+    return np.minimum((rng.random(size) * high).astype(np.int64), high - 1)
+
+
+def random_regular_graph(node_ids, degree, rng=np.random):
+    """
+    Union of degree // 2 random Hamiltonian cycles, and a random matching for an odd degree.
+    Every node has the given degree (at least 2), except for the rare edges sampled more than once.
+    """
+    num_nodes = len(node_ids)
+    degree = min(degree, num_nodes - 1)
+
+    orders = np.stack([ rng.permutation(num_nodes) for _ in range(max(degree // 2, 1)) ])
+    sources, destinations = [orders.ravel()], [np.roll(orders, -1, axis=1).ravel()]
+
+    if degree % 2 and degree > 1:
+        order = rng.permutation(num_nodes)
+        half = num_nodes // 2
+        sources.append(order[ : half])
+        destinations.append(order[half : 2 * half])
+
+    return Topology.from_edges(node_ids, np.concatenate(sources), np.concatenate(destinations))
+
+
+def small_world_graph(node_ids, degree, rewire_probability, rng=np.random):
+    """
+    Watts-Strogatz graph - ring lattice over a random order of the nodes, each node linked to
+    degree // 2 successors. The links other than the ring itself are rewired to a random node
+    with the given probability, so the graph stays connected.
+    """
+    num_nodes = len(node_ids)
+    half = max(min(degree, num_nodes - 1) // 2, 1)
+    order = rng.permutation(num_nodes)
+
+    sources = np.repeat(np.arange(num_nodes), half)
+    offsets = np.tile(np.arange(1, half + 1), num_nodes)
+    destinations = (sources + offsets) % num_nodes
+
+    rewire = (offsets > 1) & (rng.random(sources.size) < rewire_probability)
+    destinations[rewire] = get_random_integers(rng, num_nodes, int(rewire.sum()))
+
+    return Topology.from_edges(node_ids, order[sources], order[destinations])
+
+
+def geographic_graph(node_ids, location_codes, latency, degree, rng=np.random):
+    """
+    Link every node to the `degree` nodes with the least expected latency, i.e. the nodes of the
+    nearest locations (the nodes of a location being equally near, a random window of them is picked),
+    and add a cycle through the nodes ordered by location, which keeps the graph connected
+    with a single link between consecutive locations.
+    location_codes - location code of every node, latency - matrix of the mean latency between the locations
+    """
+    num_nodes = len(node_ids)
+    location_codes = np.asarray(location_codes, dtype=np.int64)
+    latency = np.asarray(latency, dtype=float)
+    degree = min(degree, num_nodes - 1)
+
+    # Nodes of every location in a random order
+    members = [ rng.permutation(np.flatnonzero(location_codes == code)) for code in range(len(latency)) ]
+
+    sources, destinations = [], []
+    for code, curr_members in enumerate(members):
+        if not curr_members.size:
+            continue
+
+        # Locations by increasing latency from the current one, ties broken at random
+        nearest_codes = np.lexsort((rng.random(len(latency)), latency[code]))
+        remaining = degree
+        for nearest_code in nearest_codes:
+            pool = members[nearest_code]
+            own_location = nearest_code == code
+            count = min(remaining, pool.size - own_location)
+            if count <= 0:
+                continue
+
+            # Window of count (+1 to skip the node itself) consecutive nodes of the pool from a random start
+            starts = get_random_integers(rng, pool.size, curr_members.size)
+            window = pool[(starts[:, None] + np.arange(count + own_location)) % pool.size]
+            if own_location:
+                is_self = window == curr_members[:, None]
+                is_self[~is_self.any(axis=1), -1] = True
+                window = window[~is_self].reshape(curr_members.size, count)
+
+            sources.append(np.repeat(curr_members, count))
+            destinations.append(window.ravel())
+            remaining -= count
+            if remaining == 0:
+                break
+
+    order = np.lexsort((rng.random(num_nodes), location_codes))
+    cycle_sources, cycle_destinations = get_cycle_edges(order)
+    sources.append(cycle_sources)
+    destinations.append(cycle_destinations)
+
+    return Topology.from_edges(node_ids, np.concatenate(sources), np.concatenate(destinations))
+
+
+def build_topology(node_ids, locations, params, latency_model, rng=np.random):
+    """
+    Build the sparse topology between the nodes as per the "topology_model" in params
+    """
+    model = params.get("topology_model", "dense")
+    degree = params.get("topology_degree", 8)
+
+    if model == "random-regular":
+        return random_regular_graph(node_ids, degree, rng)
+    if model == "small-world":
+        return small_world_graph(node_ids, degree, params.get("topology_rewire_probability", 0.1), rng)
+    if model == "geographic":
+        location_codes = [ latency_model.get_location_code(location) for location in locations ]
+        return geographic_graph(node_ids, location_codes, latency_model.mu, degree, rng)
+
+    raise RuntimeError(f"Unknown topology model '{model}', expected one of {TOPOLOGY_MODELS[1:]}")
+
+
+def get_dense_neighbours(node_ids):
+    """
+    Original random graph, every node picks n/2 + 1 random neighbours (degree >= n/2 guarantees a connected graph).
+    Returns node id -> set of neighbour ids.
+    """
+    neighbours_info = {}
+    degree = len(node_ids) // 2 + 1
+
+    for curr_node_id in node_ids:
+        possible_neighbours = list(node_ids).copy()
+        possible_neighbours.remove(curr_node_id)
+
+        neighbours_list = np.random.choice(
+            possible_neighbours, size=degree, replace=False
+        )
+
+        if curr_node_id not in neighbours_info.keys():
+            neighbours_info[curr_node_id] = set()
+
+        for neighbour_id in neighbours_list:
+            if neighbour_id not in neighbours_info.keys():
+                neighbours_info[neighbour_id] = set()
+
+            neighbours_info[curr_node_id].add(neighbour_id)
+            neighbours_info[neighbour_id].add(curr_node_id)
+
+    return neighbours_info
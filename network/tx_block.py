@@ -1,4 +1,5 @@
 from network.block import Block
+from network.vote_matrix import VoteMatrix
 
 
 class TxBlock(Block):
@@ -7,15 +8,11 @@ class TxBlock(Block):
     the shard nodes.
     """
 
-    def __init__(self, id, transactions_list, params, shard_id, shard_nodes):
-        super().__init__(id, transactions_list, params)
+    def __init__(self, id, transactions_list, params, shard_id, shard_nodes, epoch=0):
+        super().__init__(id, transactions_list, params, epoch)
         self.shard_id = shard_id
         
-        self.votes_status = {}
-        for tx in transactions_list:
-            self.votes_status[tx.id] = {}
-            for node_id in shard_nodes:
-                self.votes_status[tx.id][node_id] = -1
-                # -1 means votes has not been casted
+        # Votes of every shard node on each tx, initialised as -1 (votes has not been casted)
+        self.votes_status = VoteMatrix([ tx.id for tx in transactions_list ], shard_nodes)
         
         self.visitor_count_post_voting = {}
\ No newline at end of file
@@ -0,0 +1,51 @@
+import numpy as np
+
+
+class VoteAggregate:
+    """
+    This class models the votes of a subtree of the spanning tree of the shard on a block,
+    sent by a node to its parent (the next hop towards the shard leader) in the aggregate
+    voting protocol, instead of the whole block - the votes are a matrix of transactions x nodes.
+    """
+
+    __slots__ = ("id", "shard_id", "node_ids", "votes")
+
+    def __init__(self, id, shard_id, node_ids, votes):
+        self.id = id                    # Id of the voted block
+        self.shard_id = shard_id
+        self.node_ids = node_ids
+        self.votes = votes
+
+
+class VoteAggregator:
+    """
+    This class models the votes on a block collected by a node in the aggregate voting protocol -
+    its own vote and the votes of the subtrees of its children in the spanning tree of the shard.
+    """
+
+    def __init__(self, block, children_ids):
+        self.block = block
+        self.children_outstanding = set(children_ids)
+        self.node_ids = []
+        self.votes = []                 # Vote matrices (transactions x nodes) of the parts received
+
+    def add_votes(self, node_ids, votes):
+        self.node_ids += node_ids
+        self.votes.append(np.asarray(votes, dtype=np.int8).reshape(len(self.block.transactions_list), len(node_ids)))
+
+    def add_child_votes(self, child_id, node_ids, votes):
+        """
+        Add the votes of the subtree of the child, returns False if the child has already sent them
+        """
+        if child_id not in self.children_outstanding:
+            return False
+        self.children_outstanding.remove(child_id)
+        self.add_votes(list(node_ids), votes)
+        return True
+
+    def is_complete(self):
+        return not self.children_outstanding
+
+    def get_aggregate(self, shard_id):
+        votes = np.hstack(self.votes) if self.votes else np.zeros((len(self.block.transactions_list), 0), dtype=np.int8)
+        return VoteAggregate(self.block.id, shard_id, tuple(self.node_ids), votes)
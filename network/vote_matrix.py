@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class VoteMatrix:
+    """
+    This class models the voting state of a block: an int8 matrix of
+    transactions x shard members, along with the count of votes outstanding
+    and a per-node "has voted" bitmap with the count of voters outstanding.
+    Vote values -
+        -1 - Vote has not been casted
+         0 - Transaction rejected
+         1 - Transaction accepted
+         2 - Transaction is not relevant to the shard (cross-shard block)
+    """
+
+    def __init__(self, tx_ids, node_ids):
+        self.tx_ids = list(tx_ids)
+        self.node_ids = list(node_ids)
+        self.tx_index = { tx_id: idx for idx, tx_id in enumerate(self.tx_ids) }
+        self.node_index = { node_id: idx for idx, node_id in enumerate(self.node_ids) }
+
+        self.votes = np.full((len(self.tx_ids), len(self.node_ids)), -1, dtype=np.int8)
+        self.votes_outstanding = self.votes.size
+
+        self.voted = np.zeros(len(self.node_ids), dtype=bool)
+        self.voters_outstanding = len(self.node_ids)
+
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    def cast_vote(self, tx_id, node_id, vote):
+        """
+        Record vote of the node on a single transaction
+        """
+        row, col = self.tx_index[tx_id], self.node_index[node_id]
+        if self.votes[row, col] == -1:
+            self.votes_outstanding -= 1
+        self.votes[row, col] = vote
+
+        if not self.voted[col] and not np.any(self.votes[:, col] == -1):
+            self.mark_voted(col)
+
+    def cast_votes(self, node_id, votes):
+        """
+        Record votes of the node on every transaction (in order of tx_ids)
+        """
+        col = self.node_index[node_id]
+        self.votes_outstanding -= int(np.count_nonzero(self.votes[:, col] == -1))
+        self.votes[:, col] = votes
+
+        if not self.voted[col]:
+            self.mark_voted(col)
+
+    def cast_votes_of_nodes(self, node_ids, votes):
+        """
+        Record votes of several nodes at once - votes is a matrix of transactions x nodes (in order of node_ids)
+        """
+        cols = np.array([ self.node_index[node_id] for node_id in node_ids ], dtype=np.int64)
+        self.votes_outstanding -= int(np.count_nonzero(self.votes[:, cols] == -1))
+        self.votes[:, cols] = votes
+
+        new_voters = np.unique(cols[~self.voted[cols]])
+        self.voted[new_voters] = True
+        self.voters_outstanding -= len(new_voters)
+
+    def mark_voted(self, col):
+        self.voted[col] = True
+        self.voters_outstanding -= 1
+
+    def get_vote(self, tx_id, node_id):
+        return int(self.votes[self.tx_index[tx_id], self.node_index[node_id]])
+
+    def has_voted(self, node_id):
+        return bool(self.voted[self.node_index[node_id]])
+
+    def is_complete(self):
+        return self.voters_outstanding == 0 or not self.tx_ids
+
+    def affirmative_votes_ratio(self):
+        """
+        Return the fraction of non-rejecting votes for every transaction
+        """
+        if not self.node_ids:
+            return np.zeros(len(self.tx_ids))
+        return np.count_nonzero(self.votes, axis=1) / len(self.node_ids)
+
+    def decided_transactions(self):
+        """
+        Return mask of the transactions which are completely voted and relevant to the shard
+        """
+        if not self.node_ids:
+            return np.zeros(len(self.tx_ids), dtype=bool)
+        return ~np.any((self.votes == -1) | (self.votes == 2), axis=1)
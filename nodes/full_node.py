@@ -1,6 +1,7 @@
 from matplotlib.font_manager import json_dump
 import numpy as np
 import random
+import simpy
 import functools
 import operator
 import json
@@ -10,16 +11,22 @@ from interruptingcow import timeout
 
 from nodes.participating_node import ParticipatingNode
 from network.broadcast import broadcast
-from network.mini_block import MiniBlock
+from network.mini_block import MiniBlock, MiniBlockVote
+from network.vote_aggregate import VoteAggregate, VoteAggregator
 from network.tx_block import TxBlock
 from network.cross_shard_block import CrossShardBlock
 from network.block import Block
 from network.pipe import Pipe
 from factory.transaction import Transaction
 from factory.transaction_pool import TransactionPool
+from factory.batching_policy import create_batching_policy
+from factory.tx_block_pipeline import TxBlockPipeline
 from network.consensus.consensus import Consensus
-from utils.helper import get_transaction_delay, is_voting_complete, get_shard_neighbours, \
-    get_principal_committee_neigbours, is_vote_casted, can_generate_block, has_received_mini_block, \
+from utils.event_log import TX_GENERATED, BLOCK_RECEIVED, TX_BLOCK_RECEIVED_BY_LEADER, TX_BLOCK_PROPAGATED, \
+    TX_BLOCK_VOTED, TX_BLOCK_VOTING_COMPLETE, CS_BLOCK_RECEIVED_BY_ORIGIN, CS_MINI_BLOCK_GENERATED, CS_BLOCK_RECEIVED_BY_LEADER, \
+    CS_BLOCK_PROPAGATED, CS_BLOCK_VOTED, CS_BLOCK_VOTING_COMPLETE, VOTES_SENT
+from utils.helper import get_transaction_delay, is_voting_complete, \
+    is_vote_casted, can_generate_block, has_received_mini_block, \
     is_voting_complete_for_cross_shard_block, is_vote_casted_for_cross_shard_block, received_cross_shard_block_for_first_time, \
     filter_transactions
 
@@ -30,8 +37,12 @@ class FullNode(ParticipatingNode):
     These nodes are the subsets of the participating nodes.
     """
 
-    def __init__(self, id, env, location, params):
+    def __init__(self, id, env, location, params, latency_model, delay_sampler, metrics, event_log):
         super().__init__(id, env, location, params)
+        self.latency_model = latency_model
+        self.delay_sampler = delay_sampler
+        self.metrics = metrics
+        self.event_log = event_log
 
         self.node_type = 0
         """ 
@@ -48,12 +59,19 @@ class FullNode(ParticipatingNode):
         self.neighbours_ids = []
         self.blockchain = []
         self.shard_leaders = {}
+        self.network_index = None       # Topology indexes of the current epoch (set by the Network)
+        self.epoch = -1
+        self.processes = []             # Processes of the role of the node in the current epoch
+        self.transaction_pool = None
+        self.pipes = None
+        self.batching_policies = {}     # tx type -> batching policy of the leader
+        self.pipeline = None            # Tx-blocks (and cross-shard blocks) of the leader in flight / batched into mini-blocks
+        self.vote_aggregators = {}      # id of the block -> votes collected from the subtree (aggregate voting protocol)
+        self.aggregated_blocks = set()  # ids of the blocks whose votes have been sent to the parent / recorded by the leader
 
         # Handled by only principal committee
         self.mini_block_consensus_pool = {}
         self.processed_mini_blocks = []
-        self.processed_tx_blocks = []
-        self.current_tx_blocks = []
         
         # Experimental
         self.pc_leader_id = -1
@@ -64,11 +82,19 @@ class FullNode(ParticipatingNode):
     def add_network_parameters(self, curr_shard_nodes, neighbours_ids):
         self.curr_shard_nodes = curr_shard_nodes
         self.neighbours_ids = neighbours_ids
-        self.transaction_pool = TransactionPool(
-            self.env, self.id, neighbours_ids, curr_shard_nodes, self.params
-        )
-        self.pipes = Pipe(self.env, self.id, self.curr_shard_nodes)
-        self.env.process(self.receive_block())
+
+        # Pool, pipe and the receiving process are created once and reused in the subsequent epochs
+        if self.transaction_pool is None:
+            self.transaction_pool = TransactionPool(
+                self.env, self.id, neighbours_ids, curr_shard_nodes, self.params
+            )
+            self.metrics.add_seen_cache(self.transaction_pool.seen_transactions)
+            self.pipes = Pipe(self.env, self.id, self.curr_shard_nodes, self.latency_model, self.params.get("pipe_mode", "event"))
+            self.env.process(self.receive_block())
+        else:
+            self.transaction_pool.neighbours_ids = neighbours_ids
+            self.transaction_pool.nodes = curr_shard_nodes
+            self.pipes.all_nodes = curr_shard_nodes
 
     def init_shard_leaders(self, leaders):
         self.shard_leaders = leaders
@@ -77,6 +103,53 @@ class FullNode(ParticipatingNode):
         self.neighbours_ids = neighbours_ids
         self.transaction_pool.neighbours_ids = neighbours_ids
 
+    def start_process(self, generator):
+        """
+        Start a process of the role of the node in the current epoch
+        """
+        self.processes.append(self.env.process(generator))
+
+    def leave_epoch(self, epoch):
+        """
+        Retire the processes of the current epoch and drop its consensus state, before the network is reconfigured
+        """
+        for process in self.processes:
+            if process.is_alive:
+                process.interrupt("reconfiguration")
+        self.processes = []
+
+        self.epoch = epoch
+        self.batching_policies = {}
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
+        self.vote_aggregators = {}
+        self.aggregated_blocks = set()
+        self.mini_block_consensus_pool = {}
+        self.processed_mini_blocks = []
+        self.mini_blocks_vote_pool = []
+
+    def is_stale(self, packeted_message):
+        """
+        Messages of the consensus of a previous epoch are obsolete, as the committees have been reconfigured since.
+        The blocks carry the epoch they were generated in, as they may be relayed further in the next epoch.
+        (Final) Blocks are always accepted, as they update the state of the Blockchain.
+        """
+        message = packeted_message.message
+        if type(message) is Block:
+            return False
+        if isinstance(message, Block):
+            return message.epoch != self.epoch
+        return packeted_message.epoch != self.epoch
+
+    def reset_role(self):
+        self.node_type = 0
+        self.shard_id = -1
+        self.shard_leader_id = -1
+        self.pc_leader_id = -1
+        self.next_hop_id = -1
+        self.shard_leaders = {}
+
 
     def generate_transactions(self):
         """
@@ -89,34 +162,24 @@ class FullNode(ParticipatingNode):
         num = 0
         while True:
             delay = get_transaction_delay(
-                self.params["transaction_mu"], self.params["transaction_sigma"]
+                self.params["transaction_mu"], self.params["transaction_sigma"], self.delay_sampler
             )
-            yield self.env.timeout(delay)
+            try:
+                yield self.env.timeout(delay)
+            except simpy.Interrupt:
+                return      # Retired on reconfiguration of the network
             
-            value = np.random.randint(self.params["tx_value_low"], self.params["tx_value_high"])
+            value = int(np.random.randint(self.params["tx_value_low"], self.params["tx_value_high"]))
             reward = value * self.params["reward_percentage"]
 
-            transaction_state = {}
-            for key, value in self.curr_shard_nodes.items():
-                transaction_state[key] = 0
-
-            cross_shard_status = random.random() <= self.params["cross_shard_tx_percentage"]
+            cross_shard_status = int(random.random() <= self.params["cross_shard_tx_percentage"])
             
-            # id = int(1000*round(self.env.now, 3))
-            id = str(uuid.uuid4())
-            transaction = Transaction(f"T_{self.id}_{id}", self.env.now, value, reward, transaction_state, cross_shard_status)
+            transaction = Transaction(Transaction.allocate_id(), self.env.now, value, reward, cross_shard_status, self.shard_id)
             
-            self.params["generated_tx_count"] += 1
-            self.params["generated_intra_shard_tx_count"] += 1 - cross_shard_status
-            self.params["generated_cross_shard_tx_count"] += cross_shard_status
+            self.metrics.record_generated(transaction)
             
             if self.params["verbose"]:
-                print(
-                    "%7.4f" % self.env.now
-                    + " : "
-                    + "%s added with reward %.2f"
-                    % (transaction.id, transaction.reward)
-                )
+                self.event_log.record(TX_GENERATED, self.id, transaction.id, transaction.reward)
 
             neighbour_ids = [self.id if self.next_hop_id == -1 else self.next_hop_id]
             broadcast(
@@ -188,6 +251,58 @@ class FullNode(ParticipatingNode):
     #             yield self.env.timeout(delay)
 
 
+    def wait_for_batch(self, tx_type):
+        """
+        Wait (without polling the pool) till a batch of transactions of the type is available,
+        followed by the time taken to process it. Returns False if the node is retired meanwhile.
+        """
+        try:
+            while True:
+                batch_size, max_wait = self.batching_policies[tx_type].get_trigger()
+                yield self.transaction_pool.batch_ready(tx_type, batch_size, max_wait)
+                if not self.transaction_pool.get_queue(tx_type).is_empty():
+                    break
+
+            # Back-pressure - wait for a tx-block in flight to be voted if the pipeline is full
+            slot = self.pipeline.acquire_slot()
+            if slot is not None:
+                yield slot
+
+            delay = get_transaction_delay(
+                self.params["transaction_mu"], self.params["transaction_sigma"], self.delay_sampler
+            )
+            yield self.env.timeout(delay)
+        except simpy.Interrupt:
+            return False        # Retired on reconfiguration of the network
+        return True
+
+
+    def get_batch_size(self, tx_type):
+        queue_length = self.transaction_pool.get_queue(tx_type).length()
+        return self.batching_policies[tx_type].get_batch_size(queue_length)
+
+
+    def record_voting_latency(self, block, tx_type):
+        """
+        Report the time taken to vote the tx-block (or cross-shard block) of the leader to its batching policy
+        """
+        cut_time = self.pipeline.complete(block.id)
+        if cut_time is not None and tx_type in self.batching_policies:
+            self.batching_policies[tx_type].record_voting_latency(self.env.now - cut_time)
+
+
+    def init_pipeline(self):
+        """
+        Create the pipeline of the tx-blocks of the leader, shared by the intra-shard and cross-shard blocks
+        """
+        if self.pipeline is None:
+            self.pipeline = TxBlockPipeline(self.env, self.shard_id, self.params, self.metrics)
+
+
+    def has_processed_tx_block(self, block_id):
+        return self.pipeline is not None and self.pipeline.is_processed(block_id)
+
+
     def preprocess_intra_shard_transactions(self):
         """
         Helper function to pre-process intra-shard transactions
@@ -196,40 +311,32 @@ class FullNode(ParticipatingNode):
         if self.node_type != 2:
             raise RuntimeError("Pre-processing can only be performed by the shard leader")
 
-        while True:
-            if self.transaction_pool.intra_shard_tx_queue.length() >= self.params["tx_block_capacity"]:
-                delay = get_transaction_delay(
-                    self.params["transaction_mu"], self.params["transaction_sigma"]
-                )
-                yield self.env.timeout(delay)
+        self.batching_policies['intra-shard'] = create_batching_policy(self.params, self.shard_id)
+        self.init_pipeline()
+        while (yield from self.wait_for_batch('intra-shard')):
+            intra_shard_txns = self.transaction_pool.pop_transaction(self.get_batch_size('intra-shard'), 'intra-shard')
+            self.metrics.record_stage('tx-block', intra_shard_txns)
+            shard_neighbours = list(self.network_index.shard_neighbours[self.id])
+            filtered_curr_shard_nodes = self.network_index.shard_voters[self.shard_id]
 
-                intra_shard_txns = self.transaction_pool.pop_transaction(self.params["tx_block_capacity"], 'intra-shard')
-                shard_neighbours = get_shard_neighbours(self.curr_shard_nodes, self.neighbours_ids, self.shard_id)
-                
-                filtered_curr_shard_nodes = []
-                for node_id in self.curr_shard_nodes.keys():
-                    if self.curr_shard_nodes[node_id].shard_id == self.shard_id and self.curr_shard_nodes[node_id].node_type == 3:
-                        filtered_curr_shard_nodes.append(node_id)
-
-                # id = int(1000*round(self.env.now, 3))
-                id = str(uuid.uuid4())
-                tx_block = TxBlock(f"TB_{self.id}_{id}", intra_shard_txns, self.params, self.shard_id, filtered_curr_shard_nodes)
-                
-                broadcast(
-                    self.env, 
-                    tx_block, 
-                    "Tx-block", 
-                    self.id, 
-                    shard_neighbours, 
-                    self.curr_shard_nodes, 
-                    self.params
-                )
+            # id = int(1000*round(self.env.now, 3))
+            id = str(uuid.uuid4())
+            tx_block = TxBlock(f"TB_{self.id}_{id}", intra_shard_txns, self.params, self.shard_id, filtered_curr_shard_nodes, self.epoch)
+            self.pipeline.add(tx_block)
+
+            if self.is_aggregate_voting():
+                self.start_vote_aggregation(tx_block, "Tx-block")
+                continue
             
-            else:       # To avoid code being stuck in an infinite loop
-                delay = get_transaction_delay(
-                    self.params["transaction_mu"], self.params["transaction_sigma"]
-                )
-                yield self.env.timeout(delay)
+            broadcast(
+                self.env, 
+                tx_block, 
+                "Tx-block", 
+                self.id, 
+                shard_neighbours, 
+                self.curr_shard_nodes, 
+                self.params
+            )
 
 
     def preprocess_cross_shard_transactions(self):
@@ -240,48 +347,37 @@ class FullNode(ParticipatingNode):
         if self.node_type != 2:
             raise RuntimeError("Pre-processing can only be performed by the shard leader")
 
-        while True:
-            if self.transaction_pool.cross_shard_tx_queue.length() >= self.params["tx_block_capacity"]:
-                delay = get_transaction_delay(
-                    self.params["transaction_mu"], self.params["transaction_sigma"]
-                )
-                yield self.env.timeout(delay)
-
-                cross_shard_txns = self.transaction_pool.pop_transaction(self.params["tx_block_capacity"], 'cross-shard')
-                for txn in cross_shard_txns:
-                    txn.cross_shard_status = 1
-                    receiver_node_id = self.get_cross_shard_random_node_id()
-                    
-                    if self.curr_shard_nodes[receiver_node_id].node_type == 1:
-                        print(self.shard_leaders.keys())
-                        raise RuntimeError(f"Principal committee node {receiver_node_id} can't be a receiver of cross-shard tx for tx {txn.id}")
-                    txn.set_receiver(receiver_node_id)
-                    
-                filtered_curr_shard_nodes = []
-                for node_id in self.curr_shard_nodes.keys():
-                    if self.curr_shard_nodes[node_id].shard_id == self.shard_id and self.curr_shard_nodes[node_id].node_type == 3:
-                        filtered_curr_shard_nodes.append(node_id)
+        self.batching_policies['cross-shard'] = create_batching_policy(self.params, self.shard_id)
+        self.init_pipeline()
+        while (yield from self.wait_for_batch('cross-shard')):
+            cross_shard_txns = self.transaction_pool.pop_transaction(self.get_batch_size('cross-shard'), 'cross-shard')
+            for txn in cross_shard_txns:
+                txn.cross_shard_status = 1
+                receiver_node_id = self.get_cross_shard_random_node_id()
+                
+                if self.curr_shard_nodes[receiver_node_id].node_type == 1:
+                    print(self.shard_leaders.keys())
+                    raise RuntimeError(f"Principal committee node {receiver_node_id} can't be a receiver of cross-shard tx for tx {txn.id}")
+                txn.set_receiver(receiver_node_id)
 
-                id = str(uuid.uuid4())
-                cross_shard_block = CrossShardBlock(f"CB_{self.id}_{id}", cross_shard_txns, self.params, self.shard_id, filtered_curr_shard_nodes)
-                neighbour_shard_leaders = list(self.shard_leaders.keys())
-                neighbour_shard_leaders.remove(self.id)
+            self.metrics.record_stage('tx-block', cross_shard_txns)
+            filtered_curr_shard_nodes = self.network_index.shard_voters[self.shard_id]
 
-                broadcast(
-                    self.env, 
-                    cross_shard_block, 
-                    "Cross-shard-block", 
-                    self.id,
-                    neighbour_shard_leaders, 
-                    self.curr_shard_nodes, 
-                    self.params
-                )
+            id = str(uuid.uuid4())
+            cross_shard_block = CrossShardBlock(f"CB_{self.id}_{id}", cross_shard_txns, self.params, self.shard_id, filtered_curr_shard_nodes, self.epoch)
+            self.pipeline.add(cross_shard_block)
+            neighbour_shard_leaders = list(self.shard_leaders.keys())
+            neighbour_shard_leaders.remove(self.id)
 
-            else:       # To avoid code being stuck in an infinite loop
-                delay = get_transaction_delay(
-                    self.params["transaction_mu"], self.params["transaction_sigma"]
-                )
-                yield self.env.timeout(delay)
+            broadcast(
+                self.env, 
+                cross_shard_block, 
+                "Cross-shard-block", 
+                self.id,
+                neighbour_shard_leaders, 
+                self.curr_shard_nodes, 
+                self.params
+            )
 
 
     def generate_mini_block(self, tx_block, tx_block_type):
@@ -292,38 +388,27 @@ class FullNode(ParticipatingNode):
         if self.node_type != 2:
             raise RuntimeError("Mini-block can only be generated by the shard leader")
 
-        if tx_block not in self.processed_tx_blocks:
-            self.current_tx_blocks.append(tx_block)
-            # if self.params["verbose"]:
-            #     print(f"[Debug len]: processed_tx_blocks = {len(self.processed_tx_blocks)}")
-
-            if len(self.current_tx_blocks) >= self.params["tx_blocks_in_mini_block"]:
-                # To-Do: Maintain already processed tx-blocks list
-                self.processed_tx_blocks += self.current_tx_blocks[0 : self.params["tx_blocks_in_mini_block"]]
-                self.current_tx_blocks = self.current_tx_blocks[self.params["tx_blocks_in_mini_block"] : ]
+        if self.pipeline.add_voted(tx_block) is not None:
+            accepted_transactions = filter_transactions(tx_block, tx_block_type, self.params["cutoff_vote_percentage"])
+            # accepted_transactions = tx_block.transactions_list
+            
+            self.metrics.record_processed(tx_block.transactions_list)
 
-                accepted_transactions = filter_transactions(tx_block, tx_block_type, self.params["cutoff_vote_percentage"])
-                # accepted_transactions = tx_block.transactions_list
-                
-                self.params["processed_tx_count"] += len(tx_block.transactions_list)
-                for tx in tx_block.transactions_list:
-                    self.params["processed_intra_shard_tx_count"] += 1 - tx.cross_shard_status
-                    self.params["processed_cross_shard_tx_count"] += tx.cross_shard_status
-                    
-                # id = int(1000*round(self.env.now, 3))
-                id = str(uuid.uuid4())
-                mini_block = MiniBlock(f"MB_{self.id}_{id}", accepted_transactions, self.params, self.shard_id, self.env.now)
-                principal_committee_neigbours = get_principal_committee_neigbours(self.curr_shard_nodes, self.neighbours_ids)
-                
-                broadcast(
-                    self.env, 
-                    mini_block,
-                    "Mini-block", 
-                    self.id, 
-                    principal_committee_neigbours, 
-                    self.curr_shard_nodes, 
-                    self.params
-                )
+            # id = int(1000*round(self.env.now, 3))
+            id = str(uuid.uuid4())
+            mini_block = MiniBlock(f"MB_{self.id}_{id}", accepted_transactions, self.params, self.shard_id, self.env.now, self.epoch)
+            self.metrics.record_stage('mini-block', accepted_transactions)
+            principal_committee_neigbours = self.network_index.principal_committee_neighbours[self.id]
+            
+            broadcast(
+                self.env, 
+                mini_block,
+                "Mini-block", 
+                self.id, 
+                principal_committee_neigbours, 
+                self.curr_shard_nodes, 
+                self.params
+            )
 
 
     def generate_block(self):
@@ -352,7 +437,7 @@ class FullNode(ParticipatingNode):
         # have voted on it
 
         # Considering each principal committee node is connected to all other nodes
-        size_principal_committee = 1 + len(get_principal_committee_neigbours(self.curr_shard_nodes, self.neighbours_ids))
+        size_principal_committee = 1 + len(self.network_index.principal_committee_neighbours[self.id])
         # print(f"len = {size_principal_committee}")
         
         if can_generate_block(self.mini_block_consensus_pool, size_principal_committee, self.params["num_shards"]):
@@ -401,7 +486,8 @@ class FullNode(ParticipatingNode):
             
             # id = int(1000*round(self.env.now, 3))
             id = str(uuid.uuid4())
-            block = Block(f"B_{self.id}_{id}", accepted_transactions, self.params)
+            block = Block(f"B_{self.id}_{id}", accepted_transactions, self.params, self.epoch)
+            self.metrics.record_stage('block', accepted_transactions)
             
             # Update consensus_pool
             temp_dict = self.mini_block_consensus_pool
@@ -411,11 +497,6 @@ class FullNode(ParticipatingNode):
             self.update_blockchain(block)
 
             # Broadcast the block to the shards
-            filtered_neigbours = []
-            for id in self.neighbours_ids:
-                if self.curr_shard_nodes[id].node_type == 2:
-                    filtered_neigbours.append(id)
-            
             filtered_neigbours = self.neighbours_ids
             broadcast(
                 self.env, 
@@ -448,9 +529,12 @@ class FullNode(ParticipatingNode):
         # for i in range(10000):
         #     pass
         
+        tx_block.votes_status.cast_votes(self.id, self.get_votes(tx_block))
+
+
+    def get_votes(self, tx_block):
         # To-do: Add vote option when node is unable to validate transaction
-        for tx in tx_block.transactions_list:
-            tx_block.votes_status[tx.id][self.id] = self.validate_transaction(tx)
+        return [ self.validate_transaction(tx) for tx in tx_block.transactions_list ]
 
     
     def cast_vote_for_cross_shard_block(self, cross_shard_block):
@@ -460,16 +544,126 @@ class FullNode(ParticipatingNode):
         # for i in range(10000):
         #     pass
 
+        cross_shard_block.shard_votes_status[self.shard_id].cast_votes(self.id, self.get_cross_shard_votes(cross_shard_block))
+
+
+    def get_cross_shard_votes(self, cross_shard_block):
         # To-do: Add vote option when node is unable to validate transaction
+        votes = []
+        curr_shard_nodes = self.network_index.shard_member_set[self.shard_id]
         for tx in cross_shard_block.transactions_list:
             vote = 2
 
             # If tx is relevant to this shard, vote for it else discard it by voting 2
-            curr_shard_nodes = [id for id, node in self.curr_shard_nodes.items() if node.shard_id == self.shard_id]
             if tx.receiver in curr_shard_nodes:
                 vote = self.validate_transaction(tx)
             
-            cross_shard_block.shard_votes_status[self.shard_id][tx.id][self.id] = vote
+            votes.append(vote)
+        return votes
+
+
+    def is_cross_shard_block_voted(self, cross_shard_block):
+        """
+        The cross-shard block returned to the originating leader is voted once every shard with a receiver
+        of its transactions has completely voted on it (whichever shard returns it first).
+        With flooding the block is handled on its first return - the votes of the other shards are
+        recorded in the block as they are casted, while with the aggregate protocol the votes of a shard
+        are recorded only once its leader has collected them.
+        """
+        if not self.is_aggregate_voting():
+            return True
+
+        for tx in cross_shard_block.transactions_list:
+            shard_id = self.curr_shard_nodes[tx.receiver].shard_id
+            if shard_id not in cross_shard_block.shard_votes_status or \
+                    not is_voting_complete_for_cross_shard_block(cross_shard_block, shard_id):
+                return False
+        return True
+
+
+    def is_aggregate_voting(self):
+        return self.params.get("voting_protocol", "flooding") == "aggregate"
+
+
+    def get_tree_children(self):
+        """
+        Return the neighbours of the node in the spanning tree of the shard, away from the leader
+        """
+        shard_neighbours = self.network_index.shard_neighbours[self.id]
+        if self.node_type == 2:
+            return list(shard_neighbours)
+        return [ id for id in shard_neighbours if id != self.next_hop_id ]
+
+
+    def start_vote_aggregation(self, block, object_type, votes=None):
+        """
+        Aggregate voting protocol - pass the block down the spanning tree of the shard, and collect the
+        votes of the subtree to be sent up to the leader (along with the votes of the node, if any)
+        """
+        if block.id in self.vote_aggregators or block.id in self.aggregated_blocks:
+            return
+
+        children_ids = self.get_tree_children()
+        aggregator = VoteAggregator(block, children_ids)
+        if votes is not None:
+            aggregator.add_votes([ self.id ], votes)
+        self.vote_aggregators[block.id] = aggregator
+
+        broadcast(
+            self.env, 
+            block, 
+            object_type, 
+            self.id, 
+            children_ids, 
+            self.curr_shard_nodes, 
+            self.params
+        )
+        self.send_aggregated_votes(block.id)
+
+
+    def process_received_votes(self, vote_aggregate, sender_id):
+        """
+        Handle the votes of the subtree of a child in the spanning tree
+        """
+        aggregator = self.vote_aggregators.get(vote_aggregate.id)
+        if aggregator is not None and aggregator.add_child_votes(sender_id, vote_aggregate.node_ids, vote_aggregate.votes):
+            self.send_aggregated_votes(vote_aggregate.id)
+
+
+    def send_aggregated_votes(self, block_id):
+        """
+        Send the votes to the parent once the votes of the whole subtree are collected -
+        the leader records them in the block instead, and handles it as a voted block
+        """
+        aggregator = self.vote_aggregators[block_id]
+        if not aggregator.is_complete():
+            return
+
+        del self.vote_aggregators[block_id]
+        self.aggregated_blocks.add(block_id)
+        vote_aggregate = aggregator.get_aggregate(self.shard_id)
+        block = aggregator.block
+
+        if self.node_type == 2:
+            if isinstance(block, TxBlock):
+                block.votes_status.cast_votes_of_nodes(vote_aggregate.node_ids, vote_aggregate.votes)
+                self.process_received_tx_block(block, self.id)
+            else:
+                block.shard_votes_status[self.shard_id].cast_votes_of_nodes(vote_aggregate.node_ids, vote_aggregate.votes)
+                self.process_received_cross_shard_block(block, self.id)
+        else:
+            if self.params["verbose"]:
+                self.event_log.record(VOTES_SENT, self.id, block_id, len(vote_aggregate.node_ids), self.next_hop_id)
+
+            broadcast(
+                self.env, 
+                vote_aggregate, 
+                "Votes", 
+                self.id, 
+                [ self.next_hop_id ], 
+                self.curr_shard_nodes, 
+                self.params
+            )
     
 
     def receive_block(self):
@@ -485,6 +679,9 @@ class FullNode(ParticipatingNode):
             block = packeted_message.message
             block_type = ""
 
+            if self.is_stale(packeted_message):
+                continue
+
             """
             Cross-shard Transactions -
                 Add processing step for the Cross-shard Block
@@ -493,18 +690,14 @@ class FullNode(ParticipatingNode):
             elif isinstance(block, TxBlock):            block_type = "Tx"
             elif isinstance(block, CrossShardBlock):    block_type = "Cross-shard"
             elif isinstance(block, MiniBlock):          block_type = "Mini"
+            elif isinstance(block, VoteAggregate):      block_type = "Votes"
             elif isinstance(block, Block):              block_type = "Final"
             else:
                 raise RuntimeError("Unknown Block received")
 
             if self.params["verbose"]:
                 debug_info = [ b.id for b in block ] if isinstance(block, list) else block.id
-                print(
-                    "%7.4f" % self.env.now
-                    + " : "
-                    + "Node %s received a %s-block - %s from %s"
-                    % (self.id, block_type, debug_info, packeted_message.sender_id)
-                )
+                self.event_log.record(BLOCK_RECEIVED, self.id, debug_info, block_type, packeted_message.sender_id)
 
             if isinstance(block, list):
                 self.process_received_mini_blocks_list(block, packeted_message.sender_id)
@@ -512,12 +705,11 @@ class FullNode(ParticipatingNode):
                     self.generate_block()
 
             elif isinstance(block, TxBlock):
-                if block not in self.shard_leader.processed_tx_blocks:
+                if not self.shard_leader.has_processed_tx_block(block.id):
                     self.process_received_tx_block(block, packeted_message.sender_id)
 
             elif isinstance(block, CrossShardBlock):
                 flag = block.originating_shard_id == self.shard_id
-                curr_shard_nodes = [id for id, node in self.curr_shard_nodes.items() if node.shard_id == self.shard_id]
                 # for txn in block.transactions_list:
                 #     if txn.cross_shard_status != 1 :
                 #         raise RuntimeError(f"Intra Shard transaction present in Cross Shard Block")
@@ -530,16 +722,21 @@ class FullNode(ParticipatingNode):
                 # print(f"[Check]: {block.id} has flag = {flag} for {self.id}")
                 if flag:        # Cross-shard-block has even 1 tx related to the current shard
                     if received_cross_shard_block_for_first_time(block, self.shard_id):                        
-                        curr_shard_nodes_id = [ node_id for node_id, node in self.curr_shard_nodes.items() if node.shard_id == self.shard_id]
-                        curr_shard_nodes_id.remove(self.id)
+                        curr_shard_nodes_id = [ node_id for node_id in self.network_index.shard_members[self.shard_id] if node_id != self.id ]
                         block.add_shard_info_for_voting(self.shard_id, curr_shard_nodes_id)
                         
                         delay = get_transaction_delay(
-                            self.params["transaction_mu"], self.params["transaction_sigma"]
+                            self.params["transaction_mu"], self.params["transaction_sigma"], self.delay_sampler
                         )
                         yield self.env.timeout(delay*0.4)
+                        if self.is_stale(packeted_message):
+                            continue
+
+                        if self.is_aggregate_voting():
+                            self.start_vote_aggregation(block, "Cross-shard-block")
+                            continue
 
-                        shard_neighbours = get_shard_neighbours(self.curr_shard_nodes, self.neighbours_ids, self.shard_id)
+                        shard_neighbours = self.network_index.shard_neighbours[self.id]
                         broadcast(
                             self.env, 
                             block, 
@@ -567,6 +764,9 @@ class FullNode(ParticipatingNode):
 
             elif isinstance(block, Block):
                 self.process_received_block(block)
+
+            elif isinstance(block, VoteAggregate):
+                self.process_received_votes(block, packeted_message.sender_id)
     
 
     def process_received_tx_block(self, tx_block, sender_id):
@@ -584,31 +784,27 @@ class FullNode(ParticipatingNode):
         if self.node_type == 1:
             raise RuntimeError("Tx-block received by Principal Committee node.")
 
+        # Both the checks are O(1) - the block maintains a "has voted" bitmap and the count of voters outstanding
         flag = is_voting_complete(tx_block)
-        shard_neigbours = get_shard_neighbours(
-            self.curr_shard_nodes, self.neighbours_ids, self.shard_id
-        )
 
         if self.node_type == 2:
             if flag:
                 if self.params["verbose"]:
-                    print(
-                        "%7.4f" % self.env.now
-                        + " : "
-                        + "Node %s (Leader) received voted Tx-block %s" % (self.id, tx_block.id)
-                    )
+                    self.event_log.record(TX_BLOCK_RECEIVED_BY_LEADER, self.id, tx_block.id)
+                self.record_voting_latency(tx_block, 'intra-shard')
                 self.generate_mini_block(tx_block, 'intra_shard_tx_block')
             else:
                 raise RuntimeError(f"Shard Leader {self.id} received a voted Tx-block {tx_block.id} which is not been voted by all shard nodes.")
 
+        elif self.node_type == 3 and self.is_aggregate_voting():
+            if self.params["verbose"]:
+                self.event_log.record(TX_BLOCK_VOTED, self.id, tx_block.id)
+            self.start_vote_aggregation(tx_block, "Tx-block", self.get_votes(tx_block))
+
         elif self.node_type == 3:
             if flag:
                 if self.params["verbose"]:
-                    print(
-                        "%7.4f" % self.env.now
-                        + " : "
-                        + "Node %s (shard node) propagated voted Tx-block %s" % (self.id, tx_block.id)
-                    )
+                    self.event_log.record(TX_BLOCK_PROPAGATED, self.id, tx_block.id)
 
                 broadcast(
                     self.env, 
@@ -619,39 +815,30 @@ class FullNode(ParticipatingNode):
                     self.curr_shard_nodes, 
                     self.params
                 )
-            else:
-                if is_vote_casted(tx_block, self.id) == False:
-                    self.cast_vote(tx_block)
-                    if self.params["verbose"]:
-                        print(
-                            "%7.4f" % self.env.now
-                            + " : "
-                            + "Node %s voted for the Tx-block %s" % (self.id, tx_block.id)
-                        )
+            elif not is_vote_casted(tx_block, self.id):
+                self.cast_vote(tx_block)
+                if self.params["verbose"]:
+                    self.event_log.record(TX_BLOCK_VOTED, self.id, tx_block.id)
 
-                    # If voting is complete, pass the tx-block to the leader, else broadcast it further in the network
-                    neighbours = []
-                    if is_voting_complete(tx_block):
-                        neighbours = [ self.next_hop_id ]
-                        if self.params["verbose"]:
-                            print(
-                                "%7.4f" % self.env.now
-                                + " : "
-                                + "Voting for the tx-block %s is complete and node %s sent it on its path to shard leader" % (tx_block.id, self.id)
-                            )
-                    else:
-                        neighbours = shard_neigbours    # Exclude source node
-                        neighbours.remove(sender_id)
+                # If voting is complete, pass the tx-block to the leader, else broadcast it further in the network
+                neighbours = []
+                if is_voting_complete(tx_block):
+                    neighbours = [ self.next_hop_id ]
+                    if self.params["verbose"]:
+                        self.event_log.record(TX_BLOCK_VOTING_COMPLETE, self.id, tx_block.id)
+                else:
+                    neighbours = list(self.network_index.shard_neighbours[self.id])
+                    neighbours.remove(sender_id)    # Exclude source node
 
-                    broadcast(
-                        self.env, 
-                        tx_block, 
-                        "Tx-block", 
-                        self.id, 
-                        neighbours, 
-                        self.curr_shard_nodes, 
-                        self.params
-                    )
+                broadcast(
+                    self.env, 
+                    tx_block, 
+                    "Tx-block", 
+                    self.id, 
+                    neighbours, 
+                    self.curr_shard_nodes, 
+                    self.params
+                )
             
 
     def process_received_mini_blocks_list(self, blocks, sender_id):
@@ -664,21 +851,18 @@ class FullNode(ParticipatingNode):
 
         if self.id == self.pc_leader_id:
             for mini_block in blocks:
-                self.mini_block_consensus_pool[mini_block.id]["votes"][sender_id] = mini_block.message_data[sender_id]
+                self.mini_block_consensus_pool[mini_block.id]["votes"][sender_id] = mini_block.vote
             
         else:
             voted_blocks = []
             for mini_block in blocks:
-                consensus_delay_obj = Consensus(1, 1)
+                consensus_delay_obj = Consensus(1, 1, self.delay_sampler)
                 # To-do: Adjust threshold
                 threshold = 0.5
                 vote = 1 if consensus_delay_obj.get_random_number() > threshold else 0
 
-                new_mini_block = MiniBlock(mini_block.id, mini_block.transactions_list, mini_block.params, mini_block.shard_id, self.env.now)
-                new_mini_block.shard_id = mini_block.shard_id
-
-                new_mini_block.message_data[self.id] = vote
-                voted_blocks.append(new_mini_block)
+                # Only the vote is sent back, the leader already holds the mini-block
+                voted_blocks.append(MiniBlockVote(mini_block.id, vote))
             
             broadcast(
                 self.env, 
@@ -707,14 +891,14 @@ class FullNode(ParticipatingNode):
                 self.mini_block_consensus_pool[block.id]["data"] = block
                 self.mini_block_consensus_pool[block.id]["votes"] = {}
                 
-                consensus_delay_obj = Consensus(1, 1)
+                consensus_delay_obj = Consensus(1, 1, self.delay_sampler)
                 # To-do: Adjust threshold
                 threshold = 0.5
                 vote = 1 if consensus_delay_obj.get_random_number() > threshold else 0
                 self.mini_block_consensus_pool[block.id]["votes"][self.id] = vote
 
                 if len(self.mini_blocks_vote_pool) == self.params["num_shards"]:
-                    principal_committee_neigbours = get_principal_committee_neigbours(self.curr_shard_nodes, self.neighbours_ids)
+                    principal_committee_neigbours = self.network_index.principal_committee_neighbours[self.id]
                     broadcast(
                         self.env, 
                         self.mini_blocks_vote_pool, 
@@ -752,7 +936,7 @@ class FullNode(ParticipatingNode):
                 # -1 = No vote received
             
             # To-do: Adjust mu and sigma for conensus delay; yielding not working
-            consensus_delay_obj = Consensus(1, 1)
+            consensus_delay_obj = Consensus(1, 1, self.delay_sampler)
             # yield self.env.timeout(consensus_delay_obj.get_consensus_time())
 
             # To-do: Adjust threshold
@@ -845,7 +1029,7 @@ class FullNode(ParticipatingNode):
 
                 # Add own vote for the mini-block if vote not yet casted
                 if self.id not in self.mini_block_consensus_pool[block.id]["votes"]:
-                    consensus_delay_obj = Consensus(1, 1)
+                    consensus_delay_obj = Consensus(1, 1, self.delay_sampler)
                     # yield self.env.timeout(consensus_delay_obj.get_consensus_time())
 
                     # To-do: Adjust threshold
@@ -900,7 +1084,7 @@ class FullNode(ParticipatingNode):
             
         # print(f"[Check] = For {cross_shard_block.id}, {self.id} has {self.shard_id} and {cross_shard_block.originating_shard_id}")
         if self.shard_id == cross_shard_block.originating_shard_id:
-            if flag:
+            if flag and self.is_cross_shard_block_voted(cross_shard_block):
                 # print(f"Votes status -\n{print(json.dumps(cross_shard_block.shard_votes_status, indent=4))}")
                 shard_leader_map = {}
                 tx_map = {}
@@ -933,34 +1117,19 @@ class FullNode(ParticipatingNode):
                 """
 
                 if self.params["verbose"]:
-                    print(
-                        "%7.4f" % self.env.now
-                        + " : "
-                        + "Node %s (Leader) received voted cross-shard-block %s which originated in its own shard" % (self.id, cross_shard_block.id)
-                    )
-                    print(
-                        "%7.4f" % self.env.now
-                        + " : "
-                        + "Node %s (Leader) generating mini-block consisting of cross-shard tx" % (self.id)
-                    )
+                    self.event_log.record(CS_BLOCK_RECEIVED_BY_ORIGIN, self.id, cross_shard_block.id)
+                    self.event_log.record(CS_MINI_BLOCK_GENERATED, self.id)
 
                 # Generate mini-block consisting of cross-shard-blocks
+                self.record_voting_latency(cross_shard_block, 'cross-shard')
                 self.generate_mini_block(cross_shard_block, 'cross_shard_tx_block')
         else:
-            shard_neigbours = get_shard_neighbours(
-                self.curr_shard_nodes, self.neighbours_ids, self.shard_id
-            )
-
             if self.node_type == 2:
                 if flag:
                     if self.params["verbose"]:
-                        print(
-                            "%7.4f" % self.env.now
-                            + " : "
-                            + "Node %s (Leader) received voted Cross-shard-block %s but it didn't originate in its own shard" % (self.id, cross_shard_block.id)
-                        )
+                        self.event_log.record(CS_BLOCK_RECEIVED_BY_LEADER, self.id, cross_shard_block.id)
                     
-                    neighbours_list = [ node.id for node in self.shard_leaders.values() if node.shard_id == cross_shard_block.originating_shard_id]
+                    neighbours_list = [ self.network_index.shard_leaders[cross_shard_block.originating_shard_id] ]
                     # print(f"[Debug] - Sending {cross_shard_block.id} to {neighbours_list} and originating shard = {cross_shard_block.originating_shard_id}")
                     broadcast(
                         self.env, 
@@ -976,14 +1145,15 @@ class FullNode(ParticipatingNode):
                     # print(cross_shard_block.shard_votes_status)
                     raise RuntimeError(f"Shard Leader {self.id} received a voted Cross-shard-block {cross_shard_block.id} which is not been voted by all shard nodes.")
 
+            elif self.node_type == 3 and self.is_aggregate_voting():
+                if self.params["verbose"]:
+                    self.event_log.record(CS_BLOCK_VOTED, self.id, cross_shard_block.id)
+                self.start_vote_aggregation(cross_shard_block, "Cross-shard-block", self.get_cross_shard_votes(cross_shard_block))
+
             elif self.node_type == 3:
                 if flag:
                     if self.params["verbose"]:
-                        print(
-                            "%7.4f" % self.env.now
-                            + " : "
-                            + "Node %s (shard node) propagated voted Cross-shard-block %s" % (self.id, cross_shard_block.id)
-                        )
+                        self.event_log.record(CS_BLOCK_PROPAGATED, self.id, cross_shard_block.id)
 
                     broadcast(
                         self.env, 
@@ -1000,25 +1170,17 @@ class FullNode(ParticipatingNode):
                         self.cast_vote_for_cross_shard_block(cross_shard_block)
                         # print(f"Debug - Id is {cross_shard_block.id} \nVotes = {json.dumps(cross_shard_block.shard_votes_status[self.shard_id], indent=4)}")
                         if self.params["verbose"]:
-                            print(
-                                "%7.4f" % self.env.now
-                                + " : "
-                                + "Node %s voted for the Cross-shard-block %s" % (self.id, cross_shard_block.id)
-                            )
+                            self.event_log.record(CS_BLOCK_VOTED, self.id, cross_shard_block.id)
 
                         # If voting is complete, pass the Cross-shard-block to the leader, else broadcast it further in the network
                         neighbours = []
                         if is_voting_complete_for_cross_shard_block(cross_shard_block, self.shard_id):
                             neighbours = [ self.next_hop_id ]
                             if self.params["verbose"]:
-                                print(
-                                    "%7.4f" % self.env.now
-                                    + " : "
-                                    + "Voting for the Cross-shard-block %s is complete and node %s sent it on its path to shard leader" % (cross_shard_block.id, self.id)
-                                )
+                                self.event_log.record(CS_BLOCK_VOTING_COMPLETE, self.id, cross_shard_block.id)
                         else:
-                            neighbours = shard_neigbours    # Exclude source node
-                            neighbours.remove(sender_id)
+                            neighbours = list(self.network_index.shard_neighbours[self.id])
+                            neighbours.remove(sender_id)    # Exclude source node
 
                         # print(f"Sourav {self.id} - {is_voting_complete_for_cross_shard_block(cross_shard_block, self.shard_id)} and list is \n {cross_shard_block.shard_votes_status[self.shard_id]}")
                         broadcast(
@@ -1034,9 +1196,7 @@ class FullNode(ParticipatingNode):
 
     def update_blockchain(self, block):
         self.blockchain.append(block)
-        
-        if self.node_type == 2:
-            self.params["chain"] = self.blockchain
+        self.metrics.record_block(self, block)
 
 
     def get_cross_shard_random_node_id(self):
@@ -1044,9 +1204,5 @@ class FullNode(ParticipatingNode):
         while(cross_shard_leader.id == self.id):
             cross_shard_leader = random.choice(list(self.shard_leaders.values()))
         
-        curr_shard_nodes = [node for node in cross_shard_leader.curr_shard_nodes.values() if node.shard_id == cross_shard_leader.shard_id]
-        cross_shard_node = random.choice(curr_shard_nodes)
-        while(cross_shard_node.node_type == 2):
-            cross_shard_node = random.choice(curr_shard_nodes)
-        
-        return cross_shard_node.id
\ No newline at end of file
+        # Any node of the chosen shard other than its leader
+        return random.choice(self.network_index.shard_voters[cross_shard_leader.shard_id])
\ No newline at end of file
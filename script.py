@@ -1,38 +1,39 @@
-import json
 import os
 import sys
-import subprocess
 import time
 
-num_nodes = [100]
-num_shards = [i for i in range(3, 60)]
-# tx_block_capacity = [5, 8, 10, 15, 20]
-cs_tx_fraction = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
-
-dir_suffix = time.strftime('%Y-%m-%d/%H-%M')
-
-for node_cnt in num_nodes:
-    for shard_cnt in num_shards:
-        if shard_cnt == int(0.65 * node_cnt / 3):
-            break
-        
-        for cs_tx_ratio in cs_tx_fraction:
-            filename = 'config/params.json'
-            with open(filename, 'r') as f:
-                data = json.load(f)
-                data['num_nodes'] = node_cnt
-                data['num_shards'] = shard_cnt
-                data['verbose'] = 0 if node_cnt > 15 else 1
-                data['cross_shard_tx_percentage'] = cs_tx_ratio
-                
-            os.remove(filename)
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=4)
-
-            cmd = ['python', 'simulate.py', dir_suffix]
-            proc = subprocess.Popen(cmd)
-            proc.wait()
-
-            (stdout, stderr) = proc.communicate()
-            if proc.returncode != 0:
-                sys.exit("\n\x1b[1;31m[script.py]: Aw, Snap! An error has occurred")
\ No newline at end of file
+from sweep import load_base_parameters, expand_grid, run_sweep
+
+
+def main():
+    num_nodes = [100]
+    num_shards = [i for i in range(3, 60)]
+    # tx_block_capacity = [5, 8, 10, 15, 20]
+    cs_tx_fraction = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+
+    # Pass the directory suffix of an interrupted sweep to resume it
+    dir_suffix = sys.argv[1] if len(sys.argv) > 1 else time.strftime('%Y-%m-%d/%H-%M')
+    summary_file = f"logs_data/summary/{os.path.dirname(dir_suffix)}/{os.path.basename(dir_suffix)}_summary.csv"
+
+    base_params = load_base_parameters('config/params.json')
+    grid = {
+        'num_nodes': num_nodes,
+        'num_shards': num_shards,
+        'cross_shard_tx_percentage': cs_tx_fraction,
+    }
+
+    runs = []
+    for run_id, params in expand_grid(base_params, grid):
+        if params['num_shards'] >= int(0.65 * params['num_nodes'] / 3):
+            continue
+
+        params['verbose'] = 0 if params['num_nodes'] > 15 else 1
+        runs.append((run_id, params))
+
+    failed_runs = run_sweep(runs, dir_suffix, summary_file)
+    if failed_runs:
+        sys.exit(f"\n\x1b[1;31m[script.py]: Aw, Snap! {failed_runs} run(s) failed")
+
+
+if __name__=="__main__":
+    main()
@@ -1,21 +1,24 @@
 import os, sys
 import simpy
 import numpy as np
+import random
 import json
 import pathlib
 import time
 
 from network.network import Network
+from factory.transaction import Transaction
 from utils.color_print import ColorPrint
+from utils.metrics import write_summary
+from utils.event_log import EventLog
 
 
-def execute_simulation(name, env, params):
-    network_obj = Network(name, env, params)
+def execute_simulation(name, env, params, event_log=None):
+    network_obj = Network(name, env, params, event_log)
     network_obj.execute_sybil_resistance_mechanism()
 
-
-    for idx in range(params["num_epochs"]):
-        network_obj.run_epoch()
+    # Epochs are executed back-to-back in simulated time, starting with the first one right away
+    network_obj.start_epochs()
     
     """
     To-Do:  Decide where it should be put.
@@ -23,11 +26,13 @@ def execute_simulation(name, env, params):
     """
     env.run(until=params["simulation_time"])
 
+    return network_obj
+
 
 def load_parameters():
     params_file = "config/params.json"
     if len(sys.argv) > 2:
-        params_file = sys.argv[1]
+        params_file = sys.argv[2]
 
     with open(params_file, "r") as f:
         params = f.read()
@@ -36,75 +41,138 @@ def load_parameters():
     return params
 
 
-def main():
-    np.random.seed(7)
-    params = load_parameters()
+def get_summary_file_name(log_file_name):
+    return f"{os.path.splitext(log_file_name)[0]}.json"
+
+
+def get_event_log_file_name(log_file_name):
+    return f"{os.path.splitext(log_file_name)[0]}.events"
+
+
+def create_event_log(env, params, log_file_name):
+    """
+    Verbose events are printed in the logs ("text") or recorded in a separate file ("ndjson")
+    """
+    event_log_format = params.get("event_log_format", "text")
+    if event_log_format == "text":
+        return EventLog(env)
+    elif event_log_format == "ndjson":
+        return EventLog(env, get_event_log_file_name(log_file_name))
+    else:
+        raise RuntimeError(f"Unknown event log format '{event_log_format}' specified")
+
+
+def get_log_file_name(dir_name, params):
+    # return f"{dir_name}/simulation_results_txLimit{params['tx_block_capacity']}_n{params['num_nodes']}_sh{params['num_shards']}_sim{params['simulation_time']}.log"
+    return f"{dir_name}/simulation_results_cstx{params['cross_shard_tx_percentage']}_n{params['num_nodes']}_sh{params['num_shards']}_sim{params['simulation_time']}.log"
+
+
+def run_simulation(params, file_name, seed=7):
+    """
+    Execute a single simulation with the given params and seed, writing its logs to file_name.
+    Returns the summary of the simulation (None if it didn't execute for sufficiently long time),
+    which is also written in JSON format alongside the logs.
+    """
+    np.random.seed(seed)
+    random.seed(seed)
+    Transaction.reset_ids()
+
+    env = simpy.Environment()
+    event_log = create_event_log(env, params, file_name)
 
     orig_stdout = sys.stdout
-    dir_suffix = sys.argv[1] if len(sys.argv) > 1 else time.strftime('%Y-%m-%d/%H-%M')
-    dir_name = f"simulation_logs/{dir_suffix}"
-    
-    if not os.path.exists(dir_name):
-        ColorPrint.print_info(f"\n[Info]: Creating directory '{dir_name}' for storing the simulation logs")
-    pathlib.Path(dir_name).mkdir(parents=True, exist_ok=True)
-    # file_name = f"{dir_name}/simulation_results_txLimit{params['tx_block_capacity']}_n{params['num_nodes']}_sh{params['num_shards']}_sim{params['simulation_time']}.log"
-    file_name = f"{dir_name}/simulation_results_cstx{params['cross_shard_tx_percentage']}_n{params['num_nodes']}_sh{params['num_shards']}_sim{params['simulation_time']}.log"
-    
     f = open(file_name, 'w')
-    ColorPrint.print_info(f"\n[Info]: Writing simulation logs to the file '{file_name}'")
     sys.stdout = f
 
-    params["generated_tx_count"], params["processed_tx_count"] = 0, 0
-    params["generated_cross_shard_tx_count"], params["generated_intra_shard_tx_count"] = 0, 0
-    params["processed_cross_shard_tx_count"], params["processed_intra_shard_tx_count"] = 0, 0
+    try:
+        start_time = time.time()
+        network_obj = execute_simulation("Test Network", env, params, event_log)
+        stop_time = time.time()
 
-    start_time = time.time()
-    env = simpy.Environment()
-    execute_simulation("Test Network", env, params)
-    stop_time = time.time()
+        sim_time = stop_time - start_time
+        summary = network_obj.metrics.get_summary()
+        if summary:
+            summary['Simulation Time'] = sim_time
+            write_summary(summary, get_summary_file_name(file_name))
+        display_simulation_summary(params, sim_time, summary)
+    finally:
+        event_log.close()
+        sys.stdout = orig_stdout
+        f.close()
 
-    sim_time = stop_time - start_time
-    
+    return summary
+
+
+def format_latency(value):
+    return str(value) if isinstance(value, int) else "%.4f" % value
+
+
+def display_simulation_summary(params, sim_time, summary):
     print("\n\n============  SIMULATION DETAILS  ============")
     print(f"\nNumber of nodes = {params['num_nodes']}")
     print(f"Number of shards = {params['num_shards']}")
     print(f"Fraction of cross-shard tx = {params['cross_shard_tx_percentage']}")
     print(f"Simulation Time = {sim_time} seconds")
 
-    if 'chain' in params:
-        count, cross_shard_tx_count, intra_shard_tx_count = 0, 0, 0
-        for block in params['chain']:
-            count += len(block.transactions_list)
-
-            for tx in block.transactions_list:
-                intra_shard_tx_count += 1 - tx.cross_shard_status
-                cross_shard_tx_count += tx.cross_shard_status
-        
-        print(f"\nLength of Blockchain = {len(params['chain'])}")
-        print(f"Total no of transactions included in Blockchain = {count}")
-        print(f"Total no of intra-shard transactions included in Blockchain = {intra_shard_tx_count}")
-        print(f"Total no of cross-shard transactions included in Blockchain = {cross_shard_tx_count}")
+    if summary:
+        print(f"\nLength of Blockchain = {summary['Length of Blockchain']}")
+        for key in ['Total no of transactions included in Blockchain', 'Total no of intra-shard transactions included in Blockchain', \
+                    'Total no of cross-shard transactions included in Blockchain']:
+            print(f"{key} = {summary[key]}")
         
-        time_tx_processing = params['simulation_time'] - params['tx_start_time']
-        time_network_configuration = params['tx_start_time'] - params['network_config_start_time']
+        # time_tx_processing = params['simulation_time'] - params['tx_start_time']
+        # time_network_configuration = params['tx_start_time'] - params['network_config_start_time']
+
+        print()
+        for key in ['Total no of transactions processed', 'Total no of intra-shard transactions processed', \
+                    'Total no of cross-shard transactions processed']:
+            print(f"{key} = {summary[key]}")
+
+        print()
+        for key in ['Total no of transactions generated', 'Total no of intra-shard transactions generated', \
+                    'Total no of cross-shard transactions generated']:
+            print(f"{key} = {summary[key]}")
+
+        print(f"\nProcessed TPS = {summary['Processed TPS']}")
+        print(f"Accepted TPS = {summary['Accepted TPS']}")
+
+        print("\nLatency of the stages (count / mean / p50 / p95 / p99) -")
+        for stage, latency in summary['Latency of stages'].items():
+            for tx_type in ['all', 'intra-shard', 'cross-shard']:
+                if tx_type in latency.get('all', {}):
+                    print(f"{stage:>10} ({tx_type:>11}) = " + " / ".join(format_latency(value) for value in latency['all'][tx_type].values()))
 
-        print(f"\nTotal no of transactions processed = {params['processed_tx_count']}")
-        print(f"Total no of intra-shard transactions processed = {params['processed_intra_shard_tx_count']}")
-        print(f"Total no of cross-shard transactions processed = {params['processed_cross_shard_tx_count']}")
+        print("\nOccupancy of the tx-block pipelines (mean / max / fraction of time full) -")
+        for shard_id, occupancy in summary['Pipeline occupancy'].items():
+            print(f"Shard {shard_id:>4} = " + " / ".join(format_latency(value) for value in occupancy.values()))
 
-        print(f"\nTotal no of transactions generated = {params['generated_tx_count']}")
-        print(f"Total no of intra-shard transactions generated = {params['generated_intra_shard_tx_count']}")
-        print(f"Total no of cross-shard transactions generated = {params['generated_cross_shard_tx_count']}")
+        print(f"\nMessages sent with the '{params.get('voting_protocol', 'flooding')}' voting protocol (count / bytes) -")
+        for message_type, messages in summary['Messages'].items():
+            print(f"{message_type:>23} = {messages['count']} / {messages['bytes']}")
 
-        print(f"\nProcessed TPS = {params['processed_tx_count']/params['simulation_time']}")
-        print(f"Accepted TPS = {count/params['simulation_time']}")
+        seen_cache = summary['Seen transactions cache']
+        print(f"\nSeen transactions cache ('{params.get('seen_cache_type', 'set')}') hits / misses / evictions = " + \
+              f"{seen_cache['hits']} / {seen_cache['misses']} / {seen_cache['evictions']}, hit rate = {seen_cache['hit rate']:.4f}")
 
         # print(f"\nLatency of network configuration (in simpy units) = {time_network_configuration}")
     else:
         print("Simulation didn't execute for sufficiently long time")
 
-    sys.stdout = orig_stdout
-    f.close()
+
+def main():
+    params = load_parameters()
+
+    dir_suffix = sys.argv[1] if len(sys.argv) > 1 else time.strftime('%Y-%m-%d/%H-%M')
+    dir_name = f"simulation_logs/{dir_suffix}"
+    
+    if not os.path.exists(dir_name):
+        ColorPrint.print_info(f"\n[Info]: Creating directory '{dir_name}' for storing the simulation logs")
+    pathlib.Path(dir_name).mkdir(parents=True, exist_ok=True)
+    file_name = get_log_file_name(dir_name, params)
+    
+    ColorPrint.print_info(f"\n[Info]: Writing simulation logs to the file '{file_name}'")
+    run_simulation(params, file_name, seed=7)
+
 
 if __name__=="__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+In-process parameter sweep engine.
+
+A grid spec (param name -> list of values) is expanded into in-memory param dicts
+which are simulated in parallel across a pool of worker processes. The shared
+config file is never modified, every run gets its own deterministic seed and the
+results are appended to a summary table as soon as a run completes, so an
+interrupted sweep can be resumed by running it again with the same directory.
+"""
+
+import os
+import copy
+import csv
+import itertools
+import json
+import pathlib
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from simulate import run_simulation
+from utils.color_print import ColorPrint
+from utils.metrics import SUMMARY_COLUMNS
+
+
+RUN_COLUMNS = ['Run ID', 'Seed']
+
+
+def load_base_parameters(params_file="config/params.json"):
+    with open(params_file, "r") as f:
+        return json.load(f)
+
+
+def get_run_id(point):
+    """
+    Return a stable identifier of a grid point
+    """
+    return "_".join(f"{key}={point[key]}" for key in sorted(point))
+
+
+def get_run_log_file_name(dir_name, run_id):
+    """
+    Return the log file of a run - named after the run id, so that the runs of a grid over
+    any of the params write separate logs (and JSON summaries)
+    """
+    file_name = re.sub(r"[^\w.=-]+", "-", run_id)
+    return f"{dir_name}/{file_name}.log"
+
+
+def get_run_seed(run_id, base_seed=7):
+    """
+    Return the seed of a run - depends only on the grid point and the base seed
+    """
+    return (zlib.crc32(run_id.encode()) ^ base_seed) & 0xffffffff
+
+
+def expand_grid(base_params, grid):
+    """
+    Expand the grid spec into a list of (run_id, params) for each combination of the values
+    """
+    keys = list(grid.keys())
+    runs = []
+    for values in itertools.product(*[ grid[key] for key in keys ]):
+        point = dict(zip(keys, values))
+        params = copy.deepcopy(base_params)
+        params.update(point)
+        runs.append((get_run_id(point), params))
+    return runs
+
+
+def read_completed_runs(summary_file):
+    """
+    Return ids of the runs which are already present in the summary table
+    """
+    if not os.path.exists(summary_file):
+        return set()
+
+    with open(summary_file, 'r', newline='') as f:
+        return { row['Run ID'] for row in csv.DictReader(f) }
+
+
+def run_point(run_id, params, dir_name, seed):
+    """
+    Execute a single run of the sweep (in a worker process)
+    """
+    file_name = get_run_log_file_name(dir_name, run_id)
+    summary = run_simulation(params, file_name, seed)
+    return run_id, seed, summary
+
+
+def run_sweep(runs, dir_suffix, summary_file, max_workers=None, base_seed=7):
+    """
+    Execute the runs which are not yet present in the summary_file, in parallel.
+    Returns the number of failed runs.
+    """
+    dir_name = f"simulation_logs/{dir_suffix}"
+    pathlib.Path(dir_name).mkdir(parents=True, exist_ok=True)
+    pathlib.Path(summary_file).parent.mkdir(parents=True, exist_ok=True)
+
+    completed_runs = read_completed_runs(summary_file)
+    pending_runs = [ (run_id, params) for run_id, params in runs if run_id not in completed_runs ]
+    ColorPrint.print_info(f"\n[Info]: {len(pending_runs)} of {len(runs)} runs pending, writing summary to '{summary_file}'")
+
+    write_header = not completed_runs and not os.path.exists(summary_file)
+    failed_runs = 0
+
+    with open(summary_file, 'a', newline='') as f, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(RUN_COLUMNS + SUMMARY_COLUMNS)
+            f.flush()
+
+        futures = {
+            executor.submit(run_point, run_id, params, dir_name, get_run_seed(run_id, base_seed)): run_id
+            for run_id, params in pending_runs
+        }
+
+        for future in as_completed(futures):
+            run_id = futures[future]
+            try:
+                run_id, seed, summary = future.result()
+            except Exception as e:
+                failed_runs += 1
+                ColorPrint.print_fail(f"[Error]: Run {run_id} failed - {e!r}")
+                continue
+
+            if summary is None:
+                failed_runs += 1
+                ColorPrint.print_warn(f"[Warning]: Run {run_id} didn't execute for sufficiently long time")
+                continue
+
+            writer.writerow([run_id, seed] + [ summary[column] for column in SUMMARY_COLUMNS ])
+            f.flush()
+            ColorPrint.print_info(f"[Info]: Completed run {run_id}")
+
+    return failed_runs
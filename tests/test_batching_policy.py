@@ -0,0 +1,40 @@
+from factory.batching_policy import create_batching_policy, FixedBatchingPolicy, MaxWaitBatchingPolicy, AdaptiveBatchingPolicy
+
+
+params = {"tx_block_capacity": 10}
+
+policy = create_batching_policy(params, 0)
+assert isinstance(policy, FixedBatchingPolicy)
+assert policy.get_trigger() == (10, None)
+assert policy.get_batch_size(3) == 10 and policy.get_batch_size(25) == 10
+
+# Without the policy specified, a max wait implies the 'max-wait' policy
+policy = create_batching_policy(dict(params, tx_block_max_wait=5), 0)
+assert isinstance(policy, MaxWaitBatchingPolicy)
+assert policy.get_trigger() == (10, 5)
+
+try:
+    create_batching_policy(dict(params, batching_policy="max-wait"), 0)
+    raise AssertionError("'max-wait' policy without tx_block_max_wait")
+except RuntimeError:
+    pass
+
+# Adaptive policy - blocks follow the backlog, the wait follows the smoothed voting latency
+policy = create_batching_policy(dict(params, batching_policy="adaptive", tx_block_max_capacity=30, tx_block_max_wait=8), 1)
+assert isinstance(policy, AdaptiveBatchingPolicy)
+assert policy.get_batch_size(4) == 10 and policy.get_batch_size(25) == 25 and policy.get_batch_size(100) == 30
+assert policy.get_trigger() == (10, 8)
+policy.record_voting_latency(20.0)
+assert policy.get_trigger() == (10, 10.0)
+policy.record_voting_latency(30.0)
+assert policy.get_trigger() == (10, 0.5 * 22.0)
+
+# Policies assigned to the shards round-robin
+policies = [ create_batching_policy(dict(params, batching_policy=["fixed", "adaptive"]), shard_id) for shard_id in range(3) ]
+assert [ type(policy) for policy in policies ] == [FixedBatchingPolicy, AdaptiveBatchingPolicy, FixedBatchingPolicy]
+
+try:
+    create_batching_policy(dict(params, batching_policy="greedy"), 0)
+    raise AssertionError("Unknown policy")
+except RuntimeError:
+    pass
@@ -0,0 +1,18 @@
+import numpy as np
+from utils.delay_sampler import DelaySampler
+
+sampler = DelaySampler(7)
+
+# Same seed and stream key should reproduce the same delays
+node_stream = sampler.spawn(1, 3)
+same_node_stream = DelaySampler(7).spawn(1, 3)
+delays = [ node_stream.sample(1, 1) for _ in range(2000) ]
+assert delays == [ same_node_stream.sample(1, 1) for _ in range(2000) ]
+assert delays != [ sampler.spawn(1, 4).sample(1, 1) for _ in range(2000) ]
+
+# Truncation holds even when most of the mass is below the cutoff
+samples = sampler.draw_block(-5, 1, 0, 10000)
+assert samples.min() >= 0
+assert np.all(sampler.draw_block(26.66, 0.0, 0, 10) == 26.66)
+
+print(f"Mean of N(1, 1) truncated at 0 = {np.mean(delays)}")
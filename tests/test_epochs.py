@@ -0,0 +1,41 @@
+import json
+import random
+
+import numpy as np
+import simpy
+
+from network.network import Network
+
+
+with open("config/params.json", "r") as f:
+    params = json.load(f)
+params.update({"num_nodes": 30, "num_epochs": 4, "epoch_reshuffle_fraction": 0.5, "simulation_time": 400, "verbose": 0})
+
+random.seed(7)
+np.random.seed(7)
+env = simpy.Environment()
+network = Network("test", env, params)
+network.execute_sybil_resistance_mechanism()
+network.start_epochs()
+
+shard_sizes = [ len(shard) for shard in network.shard_nodes ]
+leader_ids = [ network.get_shard_leader(idx).id for idx in range(len(network.shard_nodes)) ]
+principal_committee = list(network.principal_committee_node_ids)
+
+env.run(until=params["simulation_time"])
+assert network.epoch == params["num_epochs"] - 1
+assert all(node.epoch == network.epoch for node in network.full_nodes.values())
+
+# Partial reshuffle keeps the shard sizes, the leaders and the principal committee
+assert [ len(shard) for shard in network.shard_nodes ] == shard_sizes
+assert [ network.get_shard_leader(idx).id for idx in range(len(network.shard_nodes)) ] == leader_ids
+assert list(network.principal_committee_node_ids) == principal_committee
+for shard_id, shard in enumerate(network.shard_nodes):
+    assert all(network.full_nodes[node_id].shard_id == shard_id for node_id in shard)
+    assert network.network_index.shard_member_set[shard_id] == frozenset(shard)
+
+# Only the processes of the last epoch are alive
+for node in network.full_nodes.values():
+    assert all(process.is_alive for process in node.processes)
+
+assert network.metrics.get_summary() is not None
@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+import simpy
+
+from utils.event_log import EventLog, render_event, render_event_log, TX_GENERATED, BLOCK_PROPAGATED, CS_MINI_BLOCK_GENERATED
+
+env = simpy.Environment()
+file_name = os.path.join(tempfile.mkdtemp(), "simulation.events")
+
+# Small buffer to exercise the bulk flush
+event_log = EventLog(env, file_name, capacity=2)
+event_log.record(TX_GENERATED, "FN1", 7, 2.5)
+env.run(until=1.5)
+event_log.record(BLOCK_PROPAGATED, "FN2", "TB_FN2_1", "Tx-block", ["FN3", "FN4"])
+event_log.record(CS_MINI_BLOCK_GENERATED, "FN5")
+assert event_log.size == 1 and event_log.num_events == 3
+event_log.close()
+
+lines = list(render_event_log(file_name))
+print("".join(lines))
+assert lines == [
+    " 0.0000 : T_7 added with reward 2.50\n",
+    " 1.5000 : Node FN2 propagated Tx-block TB_FN2_1 to its neighbours ['FN3', 'FN4']\n",
+    " 1.5000 : Node FN5 (Leader) generating mini-block consisting of cross-shard tx\n",
+]
+assert render_event(3.25, TX_GENERATED, "FN1", 8, (1,)) == " 3.2500 : T_8 added with reward 1.00"
@@ -0,0 +1,55 @@
+import numpy as np
+
+from utils.graph_algorithms import DisjointSet, get_adjacency, kruskal, prim, bfs_parents
+
+
+disjoint_set = DisjointSet(6)
+assert disjoint_set.union(0, 1) and disjoint_set.union(2, 3) and disjoint_set.union(1, 3)
+assert not disjoint_set.union(0, 2)
+assert disjoint_set.find(0) == disjoint_set.find(3) != disjoint_set.find(4)
+assert disjoint_set.num_sets == 3
+
+# Square 0-1-2-3 with a diagonal 0-2
+sources = np.array([0, 1, 2, 3, 0])
+destinations = np.array([1, 2, 3, 0, 2])
+weights = np.array([1.0, 4.0, 2.0, 5.0, 3.0])
+
+tree_edges = kruskal(4, sources, destinations, weights)
+assert tree_edges.tolist() == [0, 2, 4]
+assert weights[tree_edges].sum() == 6.0
+
+# Unweighted - the edges are picked in their original order
+assert kruskal(4, sources, destinations).tolist() == [0, 1, 2]
+
+parents = prim(4, sources, destinations, weights, root=3)
+assert parents.tolist() == [2, 0, 3, -1]
+
+# Both the algorithms find a tree of the same weight
+rng = np.random.default_rng(7)
+num_nodes = 300
+sources = np.concatenate([np.arange(num_nodes), rng.integers(0, num_nodes, 1200)])
+destinations = np.concatenate([(np.arange(num_nodes) + 1) % num_nodes, rng.integers(0, num_nodes, 1200)])
+weights = rng.random(sources.size)
+kruskal_weight = weights[kruskal(num_nodes, sources, destinations, weights)].sum()
+
+parents = prim(num_nodes, sources, destinations, weights, root=5)
+edge_weights = {}
+for u, v, w in zip(sources.tolist(), destinations.tolist(), weights.tolist()):
+    key = (min(u, v), max(u, v))
+    edge_weights[key] = min(w, edge_weights.get(key, np.inf))
+prim_weight = sum(edge_weights[(min(u, v), max(u, v))] for u, v in enumerate(parents.tolist()) if v >= 0)
+assert abs(kruskal_weight - prim_weight) < 1e-9
+
+# Directed adjacency keeps the order of the edges
+indptr, indices, _ = get_adjacency(3, [2, 0, 2, 1], [0, 1, 1, 2])
+assert indptr.tolist() == [0, 1, 2, 4] and indices.tolist() == [1, 2, 0, 1]
+assert bfs_parents(3, indptr, indices, 0).tolist() == [-1, 0, 1]
+
+# Disconnected graph
+for build in [lambda: kruskal(4, [0, 2], [1, 3]), lambda: prim(4, [0, 2], [1, 3], [1.0, 1.0])]:
+    try:
+        build()
+        raise AssertionError("Spanning tree of a disconnected graph")
+    except RuntimeError:
+        pass
+assert bfs_parents(4, *get_adjacency(4, [0, 1, 2], [1, 0, 3])[:2], 0).tolist() == [-1, 0, -1, -1]
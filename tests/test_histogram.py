@@ -0,0 +1,27 @@
+import numpy as np
+
+from utils.histogram import StreamingHistogram
+
+values = np.random.default_rng(7).lognormal(mean=2, sigma=1, size=20000)
+
+histogram = StreamingHistogram()
+for value in values[:10000]:
+    histogram.add(value)
+
+other = StreamingHistogram()
+other.add_values(values[10000:])
+histogram.merge(other)
+
+assert histogram.count == len(values) and np.isclose(histogram.mean(), values.mean())
+for q in [0.5, 0.95, 0.99]:
+    expected = np.quantile(values, q)
+    assert abs(histogram.quantile(q) - expected) / expected < 0.05, (q, histogram.quantile(q), expected)
+
+assert histogram.quantile(0) == values.min() and histogram.quantile(1) == values.max()
+print(histogram.get_summary())
+
+# Values outside the range of the buckets are clamped to the observed extremes
+extremes = StreamingHistogram(min_value=1, max_value=100)
+extremes.add_values([0, 0.5, 1000])
+assert extremes.quantile(0.5) == 0 and extremes.quantile(1) == 1000
+assert StreamingHistogram().quantile(0.5) is None
@@ -0,0 +1,62 @@
+import simpy
+
+from factory.transaction import Transaction
+from network.block import Block
+from utils.seen_cache import SeenCache
+from utils.metrics import MetricsCollector, SUMMARY_COLUMNS, TX_STAGES
+
+
+class Node:
+    def __init__(self, node_type):
+        self.node_type = node_type
+        self.blockchain = []
+
+
+env = simpy.Environment()
+params = {"num_nodes": 10, "num_shards": 2, "cross_shard_tx_percentage": 0.5, "simulation_time": 100}
+metrics = MetricsCollector(env, params)
+assert metrics.get_summary() is None
+
+transactions = [Transaction(id, 0, 10, 1, id % 2, id // 2) for id in range(4)]
+for tx in transactions:
+    metrics.record_generated(tx)
+
+env.run(until=5)
+metrics.record_stage('tx-block', transactions)
+metrics.record_processed(transactions[:3])
+metrics.record_stage('mini-block', transactions[:3])
+
+env.run(until=20)
+metrics.record_stage('block', transactions[:2])
+
+# Hits / misses of the seen-transaction caches are summed over the nodes
+for seen_ids in [[1, 2, 1], [1, 1, 1]]:
+    cache = SeenCache(10)
+    metrics.add_seen_cache(cache)
+    for id in seen_ids:
+        cache.check_and_add(id)
+leader = Node(2)
+block = Block("B_1", transactions[:2], params)
+leader.blockchain.append(block)
+metrics.record_block(leader, block)
+
+# Only the first time a stage is reached counts
+metrics.record_stage('tx-block', transactions)
+metrics.record_block(Node(1), block)
+
+summary = metrics.get_summary()
+print(summary)
+assert all(column in summary for column in SUMMARY_COLUMNS)
+assert summary['Total no of transactions generated'] == 4 and summary['Total no of cross-shard transactions generated'] == 2
+assert summary['Total no of transactions processed'] == 3 and summary['Total no of intra-shard transactions processed'] == 2
+assert summary['Total no of transactions included in Blockchain'] == 2 and summary['Accepted TPS'] == 0.02
+assert summary['Mean confirmation latency'] == 20 and summary['Confirmation latency p99'] == 20
+
+latency = summary['Latency of stages']
+assert latency['tx-block']['all']['all']['count'] == 4 and latency['tx-block']['all']['all']['p50'] == 5
+assert list(latency['mini-block'][1]) == ['all', 'intra-shard']
+assert latency['block']['all']['all']['mean'] == 15 and latency['blockchain']['all']['all']['p95'] == 0
+assert latency['end-to-end'][0]['intra-shard']['count'] == 1 and 1 not in latency['end-to-end']
+assert transactions[0].stage == TX_STAGES.index('blockchain') and transactions[0].stage_time == 20
+assert transactions[3].stage == TX_STAGES.index('tx-block') and transactions[3].stage_time == 5
+assert summary['Seen transactions cache'] == {'hits': 3, 'misses': 3, 'evictions': 0, 'hit rate': 0.5}
@@ -0,0 +1,38 @@
+from utils.priority_queue import PriorityQueue
+
+
+class TestTransaction:
+    def __init__(self, id, reward):
+        self.id = id
+        self.reward = reward
+
+
+rewards = [5, 2, 9, 5, 2, 9, 1, 5]
+transactions = [ TestTransaction(f"T_{idx}", reward) for idx, reward in enumerate(rewards) ]
+
+queue = PriorityQueue()
+for tx in transactions:
+    queue.insert(tx)
+
+assert queue.length() == len(transactions)
+assert queue.is_present(transactions[3])
+
+# Higher reward first, FIFO among equal rewards
+expected_order = ["T_2", "T_5", "T_0", "T_3", "T_7", "T_1", "T_4", "T_6"]
+assert [ tx.id for tx in queue.get(3) ] == expected_order[:3]
+assert queue.length() == len(transactions)
+
+# Asking for more than the queue holds returns all the transactions
+small_queue = PriorityQueue()
+for tx in transactions[:3]:
+    small_queue.insert(tx)
+assert [ tx.id for tx in small_queue.get(5) ] == ["T_2", "T_0", "T_1"]
+assert small_queue.length() == 3
+
+queue.remove(transactions[0])
+assert not queue.is_present(transactions[0])
+assert [ tx.id for tx in queue.pop(4) ] == ["T_2", "T_5", "T_3", "T_7"]
+assert [ tx.id for tx in queue.pop(10) ] == ["T_1", "T_4", "T_6"]
+assert queue.is_empty() and queue.pop(1) == []
+
+print("Priority queue order -", expected_order)
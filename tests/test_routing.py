@@ -0,0 +1,30 @@
+from network.routing import ShardRoutes
+
+
+class TestNode:
+    def __init__(self, id, neighbours_ids):
+        self.id = id
+        self.neighbours_ids = neighbours_ids
+
+
+# Tree rooted at the leader 10 - 10-11, 10-12, 11-13, 11-14, 14-15 (99 is a principal committee node)
+edges = [(10, 11), (10, 12), (11, 13), (11, 14), (14, 15)]
+adjacency = {node_id: [] for node_id in range(10, 16)}
+for u, v in edges:
+    adjacency[u].append(v)
+    adjacency[v].append(u)
+adjacency[10].append(99)
+nodes = {node_id: TestNode(node_id, neighbours) for node_id, neighbours in adjacency.items()}
+
+routes = ShardRoutes(nodes, 10)
+assert routes.get_next_hops_to_leader() == {11: 10, 12: 10, 13: 11, 14: 11, 15: 14}
+
+# Shortest paths in a graph with a cycle 0-1-2-3-4-0
+nodes = {node_id: TestNode(node_id, [(node_id - 1) % 5, (node_id + 1) % 5]) for node_id in range(5)}
+routes = ShardRoutes(nodes, 0)
+assert routes.get_next_hops_to_leader() == {1: 0, 2: 1, 3: 4, 4: 0}
+
+# Unreachable member
+nodes[5] = TestNode(5, [])
+routes = ShardRoutes(nodes, 0)
+assert 5 not in routes.get_next_hops_to_leader()
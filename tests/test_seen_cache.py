@@ -0,0 +1,51 @@
+from utils.seen_cache import SeenCache, BloomFilterCache, create_seen_cache
+
+
+# Exact cache - the oldest ids are evicted first
+cache = SeenCache(3)
+for id in range(3):
+    assert not cache.check_and_add(id)
+assert cache.check_and_add(1) and len(cache) == 3
+
+cache.add(3)
+assert 0 not in cache and all(id in cache for id in [1, 2, 3])
+assert cache.evictions == 1
+
+# Re-adding an id doesn't refresh it, 1 is the next to go
+cache.add(2)
+cache.add(4)
+assert 1 not in cache and list(cache.ids) == [2, 3, 4]
+assert cache.hits == 1 and cache.misses == 3 and cache.hit_rate() == 0.25
+assert SeenCache(1).hit_rate() == 0.0
+
+# Bloom filter cache - no false negatives within the two generations
+bloom = BloomFilterCache(100, 0.01)
+assert bloom.current.nbytes == (bloom.num_bits + 7) // 8
+for id in range(100):
+    assert not bloom.check_and_add(f"T_{id}")
+assert all(f"T_{id}" in bloom for id in range(100))
+assert bloom.check_and_add("T_5") and bloom.hits == 1 and bloom.misses == 100
+assert len(bloom) == 100 and bloom.evictions == 0
+
+# The full generation becomes the old one, its ids are still seen
+new_ids = [ f"N_{id}" for id in range(1000) if f"N_{id}" not in bloom ]
+bloom.add(new_ids[0])
+assert len(bloom) == 1 and bloom.evictions == 100
+assert all(f"T_{id}" in bloom for id in range(100)) and new_ids[0] in bloom
+
+# Once the next generation is full too, the first 100 ids are dropped
+for id in new_ids[1:]:
+    bloom.add(id)
+    if bloom.evictions == 200:
+        break
+assert bloom.evictions == 200
+false_positives = sum(f"T_{id}" in bloom for id in range(100))
+assert false_positives <= 10
+
+assert isinstance(create_seen_cache({}), SeenCache)
+assert isinstance(create_seen_cache({"seen_cache_type": "bloom", "seen_cache_capacity": 10}), BloomFilterCache)
+try:
+    create_seen_cache({"seen_cache_type": "lru"})
+    raise AssertionError("Unknown cache type")
+except RuntimeError:
+    pass
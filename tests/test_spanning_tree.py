@@ -29,3 +29,51 @@ network_info = spanning_tree.Kruskal_MST()
 
 print("\n====== SPANNING TREE ======")
 print(network_info)
+
+
+# Latency weighted spanning trees
+class TestLatencyModel:
+    def get_mean_delay(self, source, destination):
+        return 0.001 if source == destination else 0.2
+
+
+class TestLocatedNode(TestNode):
+    def __init__(self, id, neighbours_ids, location):
+        super().__init__(id, neighbours_ids)
+        self.location = location
+
+
+def count_edges(network_info):
+    return sum(len(neighbours) for neighbours in network_info.values())
+
+
+# Two locations - ring 0-1-2-3-4-5-0 with a chord 0-3; 3, 4 in 'B' and the rest in 'A'
+edges = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 0), (0, 3)]
+adjacency = {node_id: [] for node_id in range(6)}
+for u, v in edges:
+    adjacency[u].append(v)
+    adjacency[v].append(u)
+nodes = {node_id: TestLocatedNode(node_id, adjacency[node_id], 'B' if node_id in (3, 4) else 'A') for node_id in range(6)}
+
+spanning_tree = SpanningTree(nodes, TestLatencyModel())
+network_info = spanning_tree.Kruskal_MST()
+assert count_edges(network_info) == 5
+# Only a single link between the locations
+cross_links = [ (u, v) for u, neighbours in network_info.items() for v in neighbours if nodes[u].location != nodes[v].location ]
+assert len(cross_links) == 1
+
+# Minimum depth tree rooted at 0 - 3 is reached directly through the chord
+network_info = SpanningTree(nodes, TestLatencyModel()).min_depth_tree(0)
+assert count_edges(network_info) == 5
+assert network_info[0] == {1, 3, 5}
+# 4 is attached to the node of its own location at depth 1
+assert 4 in network_info[3] and 4 not in network_info[5]
+
+# Disconnected graph
+nodes = {0: TestNode(0, [1]), 1: TestNode(1, [0]), 2: TestNode(2, [])}
+for build in [lambda tree: tree.Kruskal_MST(), lambda tree: tree.min_depth_tree(0)]:
+    try:
+        build(SpanningTree(nodes))
+        raise AssertionError("Spanning tree of a disconnected graph")
+    except RuntimeError:
+        pass
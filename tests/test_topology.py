@@ -0,0 +1,48 @@
+import numpy as np
+
+from network.topology import Topology, random_regular_graph, small_world_graph, geographic_graph
+
+
+def check_graph(topology, num_nodes):
+    assert topology.num_nodes == num_nodes
+    assert topology.is_connected()
+
+    neighbours = topology.get_neighbours_ids()
+    for node_id, node_neighbours in neighbours.items():
+        assert node_id not in node_neighbours
+        assert len(set(node_neighbours)) == len(node_neighbours)
+        for neighbour_id in node_neighbours:
+            assert node_id in neighbours[neighbour_id]
+
+    sources, destinations = topology.edges()
+    assert len(sources) == topology.num_edges and (sources < destinations).all()
+
+
+np.random.seed(7)
+node_ids = list(range(100, 600))
+num_nodes = len(node_ids)
+
+topology = random_regular_graph(node_ids, 8, np.random)
+check_graph(topology, num_nodes)
+assert topology.degrees().max() <= 8 and topology.degrees().mean() > 7.5
+
+topology = small_world_graph(node_ids, 6, 0.2, np.random.default_rng(7))
+check_graph(topology, num_nodes)
+assert abs(topology.degrees().mean() - 6) < 0.5
+
+# Nodes link to the nodes of their own location, and consecutive locations are linked once
+location_codes = np.arange(num_nodes) % 3
+latency = np.array([[0.001, 0.2, 0.08], [0.2, 0.001, 0.15], [0.08, 0.15, 0.001]])
+topology = geographic_graph(node_ids, location_codes, latency, 5, np.random)
+check_graph(topology, num_nodes)
+sources, destinations = topology.edges()
+assert (location_codes[sources] != location_codes[destinations]).sum() == 3
+
+# Small graphs
+check_graph(random_regular_graph([1, 2, 3], 8), 3)
+check_graph(small_world_graph([1, 2], 4, 0.5), 2)
+
+# Disconnected graph
+topology = Topology.from_edges([0, 1, 2, 3], [0, 2, 0], [1, 3, 0])
+assert topology.num_edges == 2 and not topology.is_connected()
+assert topology.neighbours(0).tolist() == [1]
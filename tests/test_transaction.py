@@ -0,0 +1,20 @@
+from factory.transaction import Transaction
+
+
+# Slotted - no per-instance __dict__, unknown attributes are rejected
+transaction = Transaction(0, 1.5, 10, 2, 1, shard_id=3)
+assert not hasattr(transaction, "__dict__")
+assert transaction.stage == -1 and transaction.stage_time == 1.5 and transaction.receiver is None
+transaction.set_receiver(7)
+assert transaction.receiver == 7
+try:
+    transaction.sender = 5
+    raise AssertionError("Attribute outside the slots")
+except AttributeError:
+    pass
+
+# Unique sequential ids, restarted from 0 for the next simulation
+Transaction.reset_ids()
+assert [ Transaction.allocate_id() for _ in range(3) ] == [0, 1, 2]
+Transaction.reset_ids()
+assert Transaction.allocate_id() == 0
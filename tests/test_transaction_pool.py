@@ -0,0 +1,45 @@
+import simpy
+
+from factory.transaction import Transaction
+from factory.transaction_pool import TransactionPool
+
+
+env = simpy.Environment()
+params = {"seen_cache_type": "set", "verbose": 0}
+pool = TransactionPool(env, 0, [], {}, params)
+results = []
+
+
+def leader(tx_type, batch_size, max_wait=None):
+    while True:
+        is_full = yield pool.batch_ready(tx_type, batch_size, max_wait)
+        results.append((env.now, tx_type, is_full, len(pool.pop_transaction(batch_size, tx_type))))
+
+
+def producer():
+    for id in range(7):
+        yield env.timeout(1)
+        pool.add_pending_transactions([Transaction(id, env.now, 10, 1, id % 2)])
+
+
+env.process(leader('intra-shard', 2))
+env.process(leader('cross-shard', 2, max_wait=2.5))
+env.process(producer())
+env.run(until=20)
+
+# Intra-shard txs arrive at 1, 3, 5, 7 - batches are cut as soon as they are full
+assert [ result for result in results if result[1] == 'intra-shard' ] == [(3, 'intra-shard', True, 2), (7, 'intra-shard', True, 2)]
+
+# Cross-shard txs arrive at 2, 4, 6 - the deadlines cut partial batches, and fire on an empty pool as well
+cross_shard_results = [ result for result in results if result[1] == 'cross-shard' ]
+assert cross_shard_results[ : 3] == [(2.5, 'cross-shard', False, 1), (5, 'cross-shard', False, 1), (7.5, 'cross-shard', False, 1)]
+assert all(count == 0 for _, _, _, count in cross_shard_results[3 : ])
+
+# A full pool triggers the event right away
+pool.add_pending_transactions([Transaction(id, env.now, 10, 1, 0) for id in range(10, 13)])
+event = pool.batch_ready('intra-shard', 3)
+assert event.triggered and event.value is True
+
+# Draining the pool drops the waiters
+event = pool.batch_ready('cross-shard', 5)
+assert len(pool.drain()) == 3 and pool.batch_waiters['cross-shard'] is None
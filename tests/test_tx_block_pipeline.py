@@ -0,0 +1,63 @@
+import simpy
+
+from factory.tx_block_pipeline import TxBlockPipeline
+from utils.metrics import MetricsCollector
+
+
+class Block:
+    def __init__(self, id):
+        self.id = id
+
+
+env = simpy.Environment()
+metrics = MetricsCollector(env, {})
+pipeline = TxBlockPipeline(env, 0, {"tx_block_pipeline_window": 2, "tx_blocks_in_mini_block": 2}, metrics)
+cut_times = []
+
+
+def leader():
+    for id in range(4):
+        slot = pipeline.acquire_slot()
+        if slot is not None:
+            yield slot
+        yield env.timeout(1)
+        pipeline.add(Block(id))
+        cut_times.append(env.now)
+
+
+def voting(id, delay):
+    yield env.timeout(delay)
+    assert pipeline.complete(id) is not None
+    assert pipeline.complete(id) is None        # Voted block returned again
+
+
+env.process(leader())
+env.process(voting(0, 5))
+env.process(voting(1, 8))
+env.run(until=10)
+
+# Blocks 2 and 3 are cut only once the blocks 0 and 1 are voted (window of 2)
+assert cut_times == [1, 2, 6, 9]
+assert set(pipeline.in_flight) == {2, 3}
+
+# Occupancy since the first block - 1 block in [1, 2), 2 in [2, 5), 1 in [5, 6), 2 in [6, 8), 1 in [8, 9), 2 in [9, 10)
+occupancy = metrics.get_pipeline_summary()[0]
+assert abs(occupancy['mean'] - 15 / 9) < 1e-9
+assert occupancy['max'] == 2
+assert abs(occupancy['full'] - 6 / 9) < 1e-9
+
+# Voted blocks are grouped into the mini-blocks by id, a block is batched only once
+blocks = [ Block(id) for id in range(3) ]
+assert pipeline.add_voted(blocks[0]) is None
+assert pipeline.add_voted(blocks[0]) is None
+assert pipeline.add_voted(blocks[1]) == blocks[:2]
+assert pipeline.add_voted(blocks[1]) is None
+assert pipeline.is_processed(1) and not pipeline.is_processed(2)
+assert pipeline.add_voted(blocks[2]) is None
+
+# Unbounded window
+pipeline = TxBlockPipeline(env, 1, {"tx_blocks_in_mini_block": 1})
+for id in range(100):
+    assert pipeline.acquire_slot() is None
+    pipeline.add(Block(id))
+assert pipeline.get_occupancy() == 100 and not pipeline.is_full()
@@ -0,0 +1,37 @@
+import numpy as np
+
+from factory.transaction import Transaction
+from network.tx_block import TxBlock
+from network.vote_aggregate import VoteAggregator
+from network.message_size import get_message_size, HEADER_SIZE, ID_SIZE, TX_SIZE, VOTE_SIZE
+
+
+transactions = [ Transaction(id, 0, 10, 1, 0) for id in range(3) ]
+voters = ["FN1", "FN2", "FN3"]
+tx_block = TxBlock("TB_0", transactions, {}, 0, voters)
+
+# A tx-block carries the transactions, and the votes of the nodes which have voted
+assert get_message_size(tx_block) == HEADER_SIZE + 3 * TX_SIZE
+tx_block.votes_status.cast_votes("FN1", [1, 1, 0])
+assert get_message_size(tx_block) == HEADER_SIZE + 3 * TX_SIZE + ID_SIZE + 3 * VOTE_SIZE
+
+# FN2 (child of FN1 in the spanning tree) is a leaf - its aggregate is complete with its own votes
+leaf = VoteAggregator(tx_block, [])
+leaf.add_votes(["FN2"], [1, 0, 1])
+assert leaf.is_complete()
+leaf_aggregate = leaf.get_aggregate(0)
+assert leaf_aggregate.id == "TB_0" and leaf_aggregate.node_ids == ("FN2",) and leaf_aggregate.votes.shape == (3, 1)
+
+# FN3 waits for the votes of its children FN2 and FN4
+inner = VoteAggregator(tx_block, ["FN2", "FN4"])
+inner.add_votes(["FN3"], [0, 1, 1])
+assert inner.add_child_votes("FN2", leaf_aggregate.node_ids, leaf_aggregate.votes)
+assert not inner.add_child_votes("FN2", leaf_aggregate.node_ids, leaf_aggregate.votes)      # Duplicate
+assert not inner.is_complete()
+assert inner.add_child_votes("FN4", ("FN4", "FN5"), np.ones((3, 2), dtype=np.int8))
+assert inner.is_complete()
+
+aggregate = inner.get_aggregate(0)
+assert aggregate.node_ids == ("FN3", "FN2", "FN4", "FN5")
+assert aggregate.votes.tolist() == [[0, 1, 1, 1], [1, 0, 1, 1], [1, 1, 1, 1]]
+assert get_message_size(aggregate) == HEADER_SIZE + 4 * ID_SIZE + 12 * VOTE_SIZE
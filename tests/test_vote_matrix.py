@@ -0,0 +1,46 @@
+from network.vote_matrix import VoteMatrix
+
+tx_ids = [10, 11, 12]
+node_ids = ["FN1", "FN2", "FN3", "FN4"]
+vote_matrix = VoteMatrix(tx_ids, node_ids)
+
+assert vote_matrix.votes_outstanding == len(tx_ids) * len(node_ids)
+assert not vote_matrix.is_complete() and not vote_matrix.has_voted("FN2")
+
+vote_matrix.cast_votes("FN1", [1, 0, 1])
+vote_matrix.cast_votes("FN2", [1, 0, 2])
+vote_matrix.cast_votes("FN3", [0, 0, 1])
+assert vote_matrix.has_voted("FN2") and vote_matrix.votes_outstanding == 3
+
+# Re-casting a vote must not change the outstanding count
+vote_matrix.cast_vote(12, "FN3", 1)
+assert vote_matrix.votes_outstanding == 3
+
+vote_matrix.cast_votes("FN4", [1, 0, 1])
+assert vote_matrix.is_complete() and vote_matrix.get_vote(11, "FN4") == 0
+assert list(vote_matrix.affirmative_votes_ratio()) == [0.75, 0.0, 1.0]
+assert list(vote_matrix.decided_transactions()) == [True, True, False]
+
+# Originating shard of a cross-shard block has nothing to vote on
+assert VoteMatrix([], []).is_complete()
+
+print(vote_matrix.votes)
+
+# Voting is tracked per node - completion depends on the voters outstanding
+partial_matrix = VoteMatrix(tx_ids, node_ids[:2])
+partial_matrix.cast_vote(10, "FN1", 1)
+assert not partial_matrix.has_voted("FN1") and partial_matrix.voters_outstanding == 2
+partial_matrix.cast_vote(11, "FN1", 1)
+partial_matrix.cast_vote(12, "FN1", 0)
+assert partial_matrix.has_voted("FN1") and partial_matrix.voters_outstanding == 1
+partial_matrix.cast_votes("FN2", [1, 1, 1])
+assert partial_matrix.is_complete()
+
+# Votes of a subtree recorded at once (aggregate voting protocol)
+aggregated_matrix = VoteMatrix(tx_ids, node_ids)
+aggregated_matrix.cast_votes_of_nodes(["FN3", "FN1"], [[0, 1], [0, 0], [1, 1]])
+assert aggregated_matrix.has_voted("FN1") and aggregated_matrix.has_voted("FN3") and not aggregated_matrix.has_voted("FN2")
+assert aggregated_matrix.voters_outstanding == 2 and aggregated_matrix.votes_outstanding == 6
+aggregated_matrix.cast_votes_of_nodes(["FN2", "FN4"], [[1, 1], [0, 0], [2, 1]])
+assert aggregated_matrix.is_complete() and aggregated_matrix.votes_outstanding == 0
+assert (aggregated_matrix.votes == vote_matrix.votes).all()
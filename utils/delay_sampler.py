@@ -0,0 +1,86 @@
+"""
+Shared sampler service for the (truncated) normally distributed delays used
+throughout the simulator. Delays are drawn in vectorized blocks per distribution
+key and handed out one by one from a ring buffer.
+"""
+
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+
+class DelaySampler:
+    def __init__(self, seed=None, block_size=1024, max_rounds=8):
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.block_size = block_size
+        self.max_rounds = max_rounds
+        self.buffers = {}           # distribution key -> [pre-drawn samples, read index]
+
+    def spawn(self, *stream_key):
+        """
+        Return an independent sampler whose seed stream is deterministically
+        derived from this sampler's seed and the (non-negative integer) stream_key,
+        e.g. one stream per node
+        """
+        seed_sequence = np.random.SeedSequence(
+            self.seed_sequence.entropy,
+            spawn_key=self.seed_sequence.spawn_key + tuple(int(key) for key in stream_key)
+        )
+        return DelaySampler(seed_sequence, self.block_size, self.max_rounds)
+
+    def draw_block(self, mu, sigma, lower, count):
+        """
+        Draw count samples of N(mu, sigma) truncated below at lower.
+        Only the rejected elements are resampled in each round; if the acceptance
+        rate is too low, the remaining ones are drawn by inverse transform sampling.
+        """
+        if sigma <= 0:
+            if mu < lower:
+                raise RuntimeError(f"Delay distribution N({mu}, {sigma}) can't produce values >= {lower}")
+            return np.full(count, float(mu))
+
+        samples = mu + sigma * self.rng.standard_normal(count)
+        rejected = np.flatnonzero(samples < lower)
+
+        for _ in range(self.max_rounds):
+            if not len(rejected):
+                return samples
+            samples[rejected] = mu + sigma * self.rng.standard_normal(len(rejected))
+            rejected = rejected[samples[rejected] < lower]
+
+        if len(rejected):
+            cdf_lower = ndtr((lower - mu) / sigma)
+            u = self.rng.uniform(cdf_lower, 1, len(rejected))
+            samples[rejected] = np.maximum(mu + sigma * ndtri(u), lower)
+
+        return samples
+
+    def sample(self, mu, sigma, lower=0):
+        """
+        Return a single delay from N(mu, sigma) truncated below at lower
+        """
+        key = (mu, sigma, lower)
+        if key not in self.buffers or self.buffers[key][1] == self.block_size:
+            self.buffers[key] = [self.draw_block(mu, sigma, lower, self.block_size), 0]
+
+        buffer = self.buffers[key]
+        value = buffer[0][buffer[1]]
+        buffer[1] += 1
+        return value
+
+    def standard_normal(self, count):
+        """
+        Return count standard normal samples from the ring buffer
+        """
+        key = None
+        if key not in self.buffers or self.buffers[key][1] + count > len(self.buffers[key][0]):
+            self.buffers[key] = [self.rng.standard_normal(max(self.block_size, count)), 0]
+
+        buffer = self.buffers[key]
+        samples = buffer[0][buffer[1] : buffer[1] + count]
+        buffer[1] += count
+        return samples
@@ -0,0 +1,129 @@
+"""
+Log of the events of a simulation run.
+
+The nodes record typed events - (timestamp, event code, node id, object id, args) -
+instead of formatting the verbose log lines in the hot paths. In the "text" format
+an event is rendered and printed as soon as it is recorded (the classic verbose log),
+while in the "ndjson" format the events are appended to a preallocated buffer which
+is flushed in bulk to a newline-delimited JSON file, and the human readable lines
+are rendered on demand with render_event_log.
+"""
+
+import json
+
+
+# Event codes
+TX_GENERATED                = 0
+TX_BROADCASTED              = 1
+TX_ACCEPTED                 = 2
+BLOCK_PROPAGATED            = 3
+BLOCK_RECEIVED              = 4
+TX_BLOCK_RECEIVED_BY_LEADER = 5
+TX_BLOCK_PROPAGATED         = 6
+TX_BLOCK_VOTED              = 7
+TX_BLOCK_VOTING_COMPLETE    = 8
+CS_BLOCK_RECEIVED_BY_ORIGIN = 9
+CS_MINI_BLOCK_GENERATED     = 10
+CS_BLOCK_RECEIVED_BY_LEADER = 11
+CS_BLOCK_PROPAGATED         = 12
+CS_BLOCK_VOTED              = 13
+CS_BLOCK_VOTING_COMPLETE    = 14
+VOTES_SENT                  = 15
+
+# Human readable format of the events, indexed by the event code
+TEMPLATES = [
+    "T_{object} added with reward {0:.2f}",
+    "T_{object} added to tx-pool of {0}",
+    "T_{object} accepted by {node}",
+    "Node {node} propagated {0} {object} to its neighbours {1}",
+    "Node {node} received a {0}-block - {object} from {1}",
+    "Node {node} (Leader) received voted Tx-block {object}",
+    "Node {node} (shard node) propagated voted Tx-block {object}",
+    "Node {node} voted for the Tx-block {object}",
+    "Voting for the tx-block {object} is complete and node {node} sent it on its path to shard leader",
+    "Node {node} (Leader) received voted cross-shard-block {object} which originated in its own shard",
+    "Node {node} (Leader) generating mini-block consisting of cross-shard tx",
+    "Node {node} (Leader) received voted Cross-shard-block {object} but it didn't originate in its own shard",
+    "Node {node} (shard node) propagated voted Cross-shard-block {object}",
+    "Node {node} voted for the Cross-shard-block {object}",
+    "Voting for the Cross-shard-block {object} is complete and node {node} sent it on its path to shard leader",
+    "Node {node} sent the votes of {0} nodes on the block {object} to {1}",
+]
+
+encoder = json.JSONEncoder(separators=(',', ':'), default=str)
+
+
+def render_event(timestamp, code, node, object, args=()):
+    return "%7.4f" % timestamp + " : " + TEMPLATES[code].format(*args, node=node, object=object)
+
+
+class EventLog:
+    def __init__(self, env, file_name=None, capacity=65536):
+        self.env = env
+        self.file_name = file_name
+        self.format = "text" if file_name is None else "ndjson"
+        self.capacity = capacity
+        self.num_events = 0
+
+        if self.format == "ndjson":
+            self.file = open(file_name, 'w')
+            self.timestamps = [0.0] * capacity
+            self.codes = [0] * capacity
+            self.nodes = [None] * capacity
+            self.objects = [None] * capacity
+            self.args = [None] * capacity
+            self.size = 0
+
+    def record(self, code, node, object=None, *args):
+        self.num_events += 1
+        if self.format == "text":
+            print(render_event(self.env.now, code, node, object, args))
+            return
+
+        idx = self.size
+        self.timestamps[idx] = self.env.now
+        self.codes[idx] = code
+        self.nodes[idx] = node
+        self.objects[idx] = object
+        self.args[idx] = args
+        self.size += 1
+
+        if self.size == self.capacity:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered events to the file in bulk
+        """
+        if self.format == "text" or self.size == 0:
+            return
+
+        lines = [
+            encoder.encode([self.timestamps[idx], self.codes[idx], self.nodes[idx], self.objects[idx], self.args[idx]])
+            for idx in range(self.size)
+        ]
+        self.file.write("\n".join(lines) + "\n")
+        self.size = 0
+
+    def close(self):
+        if self.format == "ndjson" and not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def read_event_log(file_name):
+    """
+    Yield the events (timestamp, code, node, object, args) recorded in the file
+    """
+    with open(file_name, 'r') as f:
+        for line in f:
+            timestamp, code, node, object, args = json.loads(line)
+            yield timestamp, code, node, object, args
+
+
+def render_event_log(file_name):
+    """
+    Yield the human readable lines of the events recorded in the file
+    """
+    for event in read_event_log(file_name):
+        yield render_event(*event) + "\n"
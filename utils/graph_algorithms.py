@@ -0,0 +1,146 @@
+"""
+Graph algorithms over integer node indices 0..n-1, shared by the construction of
+the spanning trees and the routing of the shards.
+
+The graphs are passed as NumPy arrays of edges (sources, destinations, weights),
+or as a CSR adjacency (indptr, indices) built from them with get_adjacency.
+"""
+
+import heapq
+from collections import deque
+
+import numpy as np
+
+
+class DisjointSet:
+    """
+    Union-find over 0..size-1 with path halving and union by rank
+    """
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+        self.num_sets = size
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]       # Point every other node on the path to its grandparent
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        """
+        Merge the sets of x and y, returns False if they are already in the same set
+        """
+        xroot, yroot = self.find(x), self.find(y)
+        if xroot == yroot:
+            return False
+
+        if self.rank[xroot] < self.rank[yroot]:
+            xroot, yroot = yroot, xroot
+        self.parent[yroot] = xroot
+        if self.rank[xroot] == self.rank[yroot]:
+            self.rank[xroot] += 1
+
+        self.num_sets -= 1
+        return True
+
+
+def get_adjacency(num_nodes, sources, destinations):
+    """
+    Return the CSR adjacency (indptr, indices, edge ids) of the directed edges, the edges
+    of every node being kept in their original order
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    destinations = np.asarray(destinations, dtype=np.int64)
+
+    edge_ids = np.argsort(sources, kind='stable')
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+    return indptr, destinations[edge_ids], edge_ids
+
+
+def kruskal(num_nodes, sources, destinations, weights=None):
+    """
+    Return the ids (positions) of the edges of the minimum spanning tree, in the order they are picked.
+    The edges of equal weight are considered in their original order.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    destinations = np.asarray(destinations, dtype=np.int64)
+    if num_nodes <= 1:
+        return np.zeros(0, dtype=np.int64)
+
+    order = np.arange(sources.size) if weights is None else np.argsort(np.asarray(weights), kind='stable')
+
+    disjoint_set = DisjointSet(num_nodes)
+    tree_edges = []
+    for edge_id, u, v in zip(order.tolist(), sources[order].tolist(), destinations[order].tolist()):
+        if disjoint_set.union(u, v):
+            tree_edges.append(edge_id)
+            if len(tree_edges) == num_nodes - 1:
+                break
+
+    if len(tree_edges) != num_nodes - 1:
+        raise RuntimeError("Spanning Tree can't be created as the graph is not connected.")
+    return np.array(tree_edges, dtype=np.int64)
+
+
+def prim(num_nodes, sources, destinations, weights, root=0):
+    """
+    Return the parent of every node in the minimum spanning tree rooted at root (-1 for the root),
+    grown from the root with a binary heap of the candidate edges (the edges are undirected)
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    destinations = np.asarray(destinations, dtype=np.int64)
+    weights = np.asarray(weights, dtype=float)
+
+    indptr, indices, edge_ids = get_adjacency(
+        num_nodes, np.concatenate([sources, destinations]), np.concatenate([destinations, sources])
+    )
+    indptr, indices = indptr.tolist(), indices.tolist()
+    edge_weights = np.concatenate([weights, weights])[edge_ids].tolist()
+
+    parents = [-1] * num_nodes
+    in_tree = [False] * num_nodes
+    heap = [(0.0, 0, root, -1)]             # (weight, order of insertion, node, parent)
+    counter, num_added = 1, 0
+    while heap:
+        _, _, u, parent = heapq.heappop(heap)
+        if in_tree[u]:
+            continue
+
+        in_tree[u] = True
+        parents[u] = parent
+        num_added += 1
+        for idx in range(indptr[u], indptr[u + 1]):
+            v = indices[idx]
+            if not in_tree[v]:
+                heapq.heappush(heap, (edge_weights[idx], counter, v, u))
+                counter += 1
+
+    if num_added != num_nodes:
+        raise RuntimeError("Spanning Tree can't be created as the graph is not connected.")
+    return np.array(parents, dtype=np.int64)
+
+
+def bfs_parents(num_nodes, indptr, indices, root):
+    """
+    Return the parent of every node in the breadth-first search tree from root
+    (-1 for the root and the nodes which can't be reached)
+    """
+    indptr, indices = indptr.tolist(), indices.tolist()
+    parents = [-1] * num_nodes
+    visited = [False] * num_nodes
+    visited[root] = True
+
+    queue = deque([root])
+    while queue:
+        u = queue.popleft()
+        for v in indices[indptr[u] : indptr[u + 1]]:
+            if not visited[v]:
+                visited[v] = True
+                parents[v] = u
+                queue.append(v)
+
+    return np.array(parents, dtype=np.int64)
@@ -1,34 +1,20 @@
 import numpy as np
-import json
-from queue import Queue
 
 
 def is_voting_complete(tx_block):
-    for tx_id, tx_status in tx_block.votes_status.items():
-        for _, node_vote in tx_status.items():
-            if node_vote == -1:
-                return False
-    return True
+    return tx_block.votes_status.is_complete()
 
 
 def is_voting_complete_for_cross_shard_block(cross_shard_block, shard_id):
-    for _, tx_status in cross_shard_block.shard_votes_status[shard_id].items():
-        for _, node_vote in tx_status.items():
-            if node_vote == -1:
-                return False
-    return True
+    return cross_shard_block.shard_votes_status[shard_id].is_complete()
 
 
 def is_vote_casted(tx_block, node_id):
-    #TODO - doubt on its correctness
-    random_tx = list(tx_block.votes_status.values())[0]
-    return random_tx[node_id] != -1
+    return tx_block.votes_status.has_voted(node_id)
 
 
 def is_vote_casted_for_cross_shard_block(cross_shard_block, shard_id, node_id):
-    #TODO - doubt on its correctness
-    random_tx = list(cross_shard_block.shard_votes_status[shard_id].values())[0]
-    return random_tx[node_id] != -1
+    return cross_shard_block.shard_votes_status[shard_id].has_voted(node_id)
 
 
 def received_cross_shard_block_for_first_time(cross_shard_block, shard_id):
@@ -66,30 +52,28 @@ def get_principal_committee_neigbours(nodes, neighbours_list):
     return principal_committee_neigbours
 
 
-def get_block_delay(mu, sigma):
-    delay = mu + sigma * np.random.randn()
-    if delay < 0:
-        return get_block_delay(mu, sigma)
-    return delay
+def get_truncated_normal_delay(mu, sigma, sampler=None):
+    """
+    Return a non-negative delay from N(mu, sigma), drawn from the sampler when provided
+    """
+    if sampler is not None:
+        return sampler.sample(mu, sigma)
 
+    if sigma <= 0 and mu < 0:
+        raise RuntimeError(f"Delay distribution N({mu}, {sigma}) can't produce non-negative values")
 
-def get_transaction_delay(mu, sigma):
     delay = mu + sigma * np.random.randn()
-    if delay < 0:
-        return get_transaction_delay(mu, sigma)
+    while delay < 0:
+        delay = mu + sigma * np.random.randn()
     return delay
 
 
-def get_transmission_delay(source, destination):
-    with open("config/params.json", "r") as f:
-        params = f.read()
-    params = json.loads(params)
-    mu = params["delay"][source][destination]["mu"]
-    sigma = params["delay"][source][destination]["sigma"]
-    delay = mu + sigma * np.random.randn()
-    if delay < 0:
-        return get_transmission_delay(source, destination)
-    return delay
+def get_block_delay(mu, sigma, sampler=None):
+    return get_truncated_normal_delay(mu, sigma, sampler)
+
+
+def get_transaction_delay(mu, sigma, sampler=None):
+    return get_truncated_normal_delay(mu, sigma, sampler)
 
 
 def can_generate_block(mini_block_consensus_pool, size_principal_committee, num_shards):
@@ -117,66 +101,20 @@ def has_received_mini_block(mini_block_consensus_pool, block_id):
     return block_id in mini_block_consensus_pool
 
 
-def assign_next_hop_to_leader(nodes, leader):
-    """
-    Perform BFS to assign next_hop to all the shard nodes
-    """
-    q = Queue(maxsize = len(nodes))
-    q.put(leader.id)
-    used = {node_id: False for node_id in nodes}
-    used[leader.id] = True
-
-    while not q.empty():
-        curr_node = nodes[q.get()]
-        for neighbour_id in curr_node.neighbours_ids:
-            if neighbour_id not in nodes:               # neighbour is a principal committee node
-                continue
-            if not used[neighbour_id]:
-                used[neighbour_id] = True
-                q.put(neighbour_id)
-                nodes[neighbour_id].next_hop_id = curr_node.id
-
-
 def filter_transactions(tx_block, tx_block_type, cutoff_vote_percentage):
     """
     Returns the filtered transactions from the tx_block based on the votes
     """
-    filtered_transactions = []
-    tx_mapping = {}
-    for tx in tx_block.transactions_list:
-        tx_mapping[tx.id] = tx
+    transactions_list = tx_block.transactions_list
 
     if tx_block_type == 'intra_shard_tx_block':
-        for tx_id, votes_info in tx_block.votes_status.items():
-            affirmative_votes_count = 0
-            for node_id, vote in votes_info.items():
-                affirmative_votes_count += 1 if vote else 0
-            
-            affirmative_votes_ratio = affirmative_votes_count / len(votes_info.keys())
-            if affirmative_votes_ratio > cutoff_vote_percentage:
-                filtered_transactions.append(tx_mapping[tx_id])
+        accepted = tx_block.votes_status.affirmative_votes_ratio() > cutoff_vote_percentage
     else:
-        shard_votes = {}
-        for shard_id, shard_info in tx_block.shard_votes_status.items():
-            for tx_id, votes_info in shard_info.items():
-                affirmative_votes_count = 0
-                flag = False
-                for node_id, vote in votes_info.items():
-                    affirmative_votes_count += 1 if vote else 0
-                    flag = (vote == 2 or vote == -1)
-                    if flag:
-                        break
-                
-                if not flag:
-                    affirmative_votes_ratio = affirmative_votes_count / len(votes_info.keys())
-                    if tx_id not in shard_votes:
-                        shard_votes[tx_id] = {}
-                    shard_votes[tx_id][shard_id] = affirmative_votes_ratio > cutoff_vote_percentage
-
-        for tx_id, votes_info in shard_votes.items():
-            for node_id, vote in votes_info.items():
-                if not vote:        # Accept the tx only when all shards vote True
-                    continue
-            filtered_transactions.append(tx_mapping[tx_id])
-
-    return filtered_transactions
\ No newline at end of file
+        # A tx is picked once any shard has completely voted on it (without discarding it by voting 2).
+        # NOTE - the per shard acceptance (affirmative votes ratio > cutoff) is not yet enforced here.
+        accepted = np.zeros(len(transactions_list), dtype=bool)
+        for shard_id, vote_matrix in tx_block.shard_votes_status.items():
+            if vote_matrix.tx_ids:
+                accepted |= vote_matrix.decided_transactions()
+
+    return [ tx for tx, flag in zip(transactions_list, accepted) if flag ]
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Streaming histogram with log-spaced buckets, used to aggregate latencies
+over a run in bounded memory. Quantiles are accurate up to the relative
+width of a bucket (~4.7% with the default 50 buckets per decade).
+"""
+
+import bisect
+import math
+
+import numpy as np
+
+
+class StreamingHistogram:
+    def __init__(self, min_value=1e-3, max_value=1e6, buckets_per_decade=50):
+        num_edges = int(round(math.log10(max_value / min_value) * buckets_per_decade)) + 1
+        self.edges = np.logspace(math.log10(min_value), math.log10(max_value), num_edges)
+        self.bounds = self.edges.tolist()                         # for bucketing single values without numpy overhead
+        self.counts = np.zeros(num_edges + 1, dtype=np.int64)     # [under min_value, buckets..., over max_value]
+
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.counts[bisect.bisect_right(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_values(self, values):
+        values = np.asarray(values, dtype=float)
+        if not values.size:
+            return
+
+        np.add.at(self.counts, np.searchsorted(self.edges, values, side='right'), 1)
+        self.count += values.size
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise RuntimeError("Histograms with different buckets can't be merged")
+
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q):
+        """
+        Return the approximate q-th quantile (0 <= q <= 1) - geometric mid-point of its bucket
+        """
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        idx = int(np.searchsorted(np.cumsum(self.counts), q * self.count, side='left'))
+        if idx == 0:
+            value = self.min
+        elif idx == len(self.edges):
+            value = self.max
+        else:
+            value = math.sqrt(self.edges[idx - 1] * self.edges[idx])
+
+        return min(max(value, self.min), self.max)
+
+    def get_summary(self, quantiles=(0.5, 0.95, 0.99)):
+        summary = { 'count': self.count, 'mean': self.mean() }
+        for q in quantiles:
+            summary[f"p{round(q * 100):g}"] = self.quantile(q)
+        return summary
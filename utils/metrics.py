@@ -0,0 +1,243 @@
+"""
+In-memory collector of the results of a simulation run.
+
+The nodes report the transactions generated, processed and included in the
+blockchain to the collector of their network, which keeps the counters and
+times every transaction as it reaches each stage of processing (a transaction
+only keeps the last stage reached and its time, in two slots).
+The latencies of the stages are aggregated into streaming histograms per stage,
+shard and type of transaction, so the memory stays bounded irrespective of the
+length of the run. The shard leaders also report the number of their tx-blocks
+in flight, which is integrated over time into the occupancy of the pipelines,
+the messages are counted (with their estimated size) by type, and the hits and
+misses of the seen-transaction caches of the nodes are summed up.
+At the end of the run the collector emits a compact summary (one JSON object /
+CSV row), so the runs of a sweep can be summarized by concatenating these rows
+instead of scanning the logs.
+"""
+
+import json
+
+from utils.histogram import StreamingHistogram
+
+
+SUMMARY_COLUMNS = ['Number of nodes', 'Number of shards', 'Fraction of cross-shard tx', 'Total no of transactions included in Blockchain', \
+                'Total no of intra-shard transactions included in Blockchain', 'Total no of cross-shard transactions included in Blockchain', \
+                'Total no of transactions processed', 'Total no of intra-shard transactions processed', 'Total no of cross-shard transactions processed', \
+                'Total no of transactions generated', 'Total no of intra-shard transactions generated', 'Total no of cross-shard transactions generated', \
+                'Processed TPS', 'Accepted TPS']
+
+# Stages of processing of a transaction after its creation, in order -
+#   tx-block    - added to a tx-block (or cross-shard block) by the shard leader
+#   mini-block  - accepted in a mini-block sent to the principal committee
+#   block       - included in a block by the principal committee
+#   blockchain  - block appended to the blockchain of a shard leader
+TX_STAGES = ['tx-block', 'mini-block', 'block', 'blockchain']
+
+# Time from creation till the last stage
+END_TO_END = 'end-to-end'
+
+TX_TYPES = ['intra-shard', 'cross-shard']
+
+
+class MetricsCollector:
+    def __init__(self, env, params):
+        self.env = env
+        self.params = params
+
+        self.counters = {}
+        for stage in ['generated', 'processed']:
+            for tx_type in ['', 'intra_shard_', 'cross_shard_']:
+                self.counters[f"{stage}_{tx_type}tx_count"] = 0
+
+        self.chain = None           # Blockchain of the (last updated) shard leader
+        self.latencies = {}         # (stage, shard id, tx type) -> histogram of time taken to reach the stage
+        self.pipelines = {}         # shard id -> time-weighted occupancy of the tx-block pipeline of the leader
+        self.messages = {}          # message type -> count and total size (in bytes) of the messages sent
+        self.seen_caches = []       # Seen-transaction caches of the pools of the nodes
+
+    def increment_tx_counters(self, stage, transactions):
+        for tx in transactions:
+            self.counters[f"{stage}_tx_count"] += 1
+            self.counters[f"{stage}_intra_shard_tx_count"] += 1 - tx.cross_shard_status
+            self.counters[f"{stage}_cross_shard_tx_count"] += tx.cross_shard_status
+
+    def record_generated(self, transaction):
+        self.increment_tx_counters('generated', [transaction])
+
+    def record_processed(self, transactions):
+        """
+        Record the transactions of a tx-block which has been processed by the shard leader
+        """
+        self.increment_tx_counters('processed', transactions)
+
+    def record_block(self, node, block):
+        """
+        Record a block appended to the blockchain of the node
+        """
+        if node.node_type == 2:
+            self.chain = node.blockchain
+            self.record_stage('blockchain', block.transactions_list)
+
+    def record_stage(self, stage, transactions):
+        """
+        Record the transactions reaching the stage - only the first time is considered
+        """
+        now = self.env.now
+        stage_index = TX_STAGES.index(stage)
+        last_stage = stage_index == len(TX_STAGES) - 1
+
+        for tx in transactions:
+            # The stages are reached in order, only the time of the last one is kept
+            if tx.stage >= stage_index:
+                continue
+            prev_time = tx.stage_time
+            tx.stage, tx.stage_time = stage_index, now
+
+            self.get_histogram(stage, tx).add(now - prev_time)
+            if last_stage:
+                self.get_histogram(END_TO_END, tx).add(now - tx.creation_time)
+
+    def get_histogram(self, stage, tx):
+        key = (stage, tx.shard_id, TX_TYPES[tx.cross_shard_status])
+        if key not in self.latencies:
+            self.latencies[key] = StreamingHistogram()
+        return self.latencies[key]
+
+    def get_latency_histograms(self, stage):
+        """
+        Return histograms of the stage keyed by (shard id, tx type), merged into 'all' for every shard / type
+        """
+        histograms = {}
+        for (curr_stage, shard_id, tx_type), histogram in self.latencies.items():
+            if curr_stage != stage:
+                continue
+
+            for key in [(shard_id, tx_type), (shard_id, 'all'), ('all', tx_type), ('all', 'all')]:
+                if key not in histograms:
+                    histograms[key] = StreamingHistogram()
+                histograms[key].merge(histogram)
+        return histograms
+
+    def get_latency_summary(self):
+        """
+        Return count, mean and percentiles of the latency of every stage as
+            stage -> shard id (or 'all') -> tx type (or 'all') -> summary
+        """
+        latency_summary = {}
+        for stage in TX_STAGES + [END_TO_END]:
+            latency_summary[stage] = {}
+            for (shard_id, tx_type), histogram in sorted(self.get_latency_histograms(stage).items(), key=str):
+                latency_summary[stage].setdefault(shard_id, {})[tx_type] = histogram.get_summary()
+        return latency_summary
+
+    def add_seen_cache(self, seen_cache):
+        self.seen_caches.append(seen_cache)
+
+    def get_seen_cache_summary(self):
+        """
+        Return the hits, misses and evictions of the seen-transaction caches of all the nodes, and the hit rate
+        """
+        hits = sum(cache.hits for cache in self.seen_caches)
+        misses = sum(cache.misses for cache in self.seen_caches)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'evictions': sum(cache.evictions for cache in self.seen_caches),
+            'hit rate': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def record_messages(self, message_type, size, count):
+        """
+        Record a message of the size (in bytes) sent to count recipients
+        """
+        if message_type not in self.messages:
+            self.messages[message_type] = { 'count': 0, 'bytes': 0 }
+        self.messages[message_type]['count'] += count
+        self.messages[message_type]['bytes'] += size * count
+
+    def record_pipeline_occupancy(self, shard_id, occupancy, is_full):
+        """
+        Record the number of tx-blocks in flight in the pipeline of the shard (and whether its window is full) from now on
+        """
+        now = self.env.now
+        if shard_id not in self.pipelines:
+            self.pipelines[shard_id] = { 'start': now, 'time': now, 'occupancy': 0, 'is_full': False, 'area': 0.0, 'full_time': 0.0, 'max': 0 }
+
+        pipeline = self.pipelines[shard_id]
+        self.update_pipeline(pipeline, now)
+        pipeline['occupancy'], pipeline['is_full'] = occupancy, is_full
+        pipeline['max'] = max(pipeline['max'], occupancy)
+
+    def update_pipeline(self, pipeline, now):
+        elapsed = now - pipeline['time']
+        pipeline['area'] += elapsed * pipeline['occupancy']
+        if pipeline['is_full']:
+            pipeline['full_time'] += elapsed
+        pipeline['time'] = now
+
+    def get_pipeline_summary(self):
+        """
+        Return shard id -> mean and max number of tx-blocks in flight, and the fraction of time the window was full
+        """
+        now = self.env.now
+        pipeline_summary = {}
+        for shard_id, pipeline in sorted(self.pipelines.items()):
+            self.update_pipeline(pipeline, now)
+            duration = now - pipeline['start']
+            pipeline_summary[shard_id] = {
+                'mean': pipeline['area'] / duration if duration else 0.0,
+                'max': pipeline['max'],
+                'full': pipeline['full_time'] / duration if duration else 0.0,
+            }
+        return pipeline_summary
+
+    def get_summary(self):
+        """
+        Return the results of the run keyed by SUMMARY_COLUMNS (None if no block has been generated)
+        """
+        if self.chain is None:
+            return None
+
+        count, cross_shard_tx_count = 0, 0
+        for block in self.chain:
+            count += len(block.transactions_list)
+            cross_shard_tx_count += sum(tx.cross_shard_status for tx in block.transactions_list)
+
+        latency_summary = self.get_latency_summary()
+        confirmation_latency = latency_summary[END_TO_END].get('all', {}).get('all', {})
+        return {
+            'Number of nodes': self.params['num_nodes'],
+            'Number of shards': self.params['num_shards'],
+            'Fraction of cross-shard tx': self.params['cross_shard_tx_percentage'],
+            'Length of Blockchain': len(self.chain),
+            'Total no of transactions included in Blockchain': count,
+            'Total no of intra-shard transactions included in Blockchain': count - cross_shard_tx_count,
+            'Total no of cross-shard transactions included in Blockchain': cross_shard_tx_count,
+            'Total no of transactions processed': self.counters['processed_tx_count'],
+            'Total no of intra-shard transactions processed': self.counters['processed_intra_shard_tx_count'],
+            'Total no of cross-shard transactions processed': self.counters['processed_cross_shard_tx_count'],
+            'Total no of transactions generated': self.counters['generated_tx_count'],
+            'Total no of intra-shard transactions generated': self.counters['generated_intra_shard_tx_count'],
+            'Total no of cross-shard transactions generated': self.counters['generated_cross_shard_tx_count'],
+            'Processed TPS': self.counters['processed_tx_count'] / self.params['simulation_time'],
+            'Accepted TPS': count / self.params['simulation_time'],
+            'Mean confirmation latency': confirmation_latency.get('mean'),
+            'Confirmation latency p50': confirmation_latency.get('p50'),
+            'Confirmation latency p95': confirmation_latency.get('p95'),
+            'Confirmation latency p99': confirmation_latency.get('p99'),
+            'Latency of stages': latency_summary,
+            'Pipeline occupancy': self.get_pipeline_summary(),
+            'Messages': dict(sorted(self.messages.items())),
+            'Seen transactions cache': self.get_seen_cache_summary(),
+        }
+
+
+def write_summary(summary, file_name):
+    with open(file_name, 'w') as f:
+        json.dump(summary, f)
+
+
+def read_summary(file_name):
+    with open(file_name, 'r') as f:
+        return json.load(f)
@@ -1,42 +1,78 @@
 """
-Custom Priority Queue implementation to maintain the order of 
-transactions to be proposed by a full node, with key as the reward
+Custom Priority Queue implementation to maintain the order of
+transactions to be proposed by a full node, with key as the reward.
+
+The queue is a binary heap keyed by (-reward, arrival sequence number), so
+transactions with equal rewards are proposed in FIFO order. A companion
+id-index gives O(1) membership checks and removal is done lazily.
 """
 
+import heapq
+import itertools
+
+
 class PriorityQueue:
     def __init__(self):
-        self.queue = []
+        self.queue = []             # heap of [-reward, seq, transaction]
+        self.entries = {}           # transaction id -> live heap entry
+        self.counter = itertools.count()
 
     def is_empty(self):
-        return len(self.queue) == []
+        return len(self.entries) == 0
 
     def is_present(self, transaction):
-        return transaction in self.queue
+        return transaction.id in self.entries
 
     def length(self):
-        return len(self.queue)
+        return len(self.entries)
 
     def insert(self, new_transaction):
-        idx = 0
-        while (idx < len(self.queue) and 
-                self.queue[idx].reward >= new_transaction.reward):
-            idx += 1
-        self.queue.insert(idx, new_transaction)
+        if new_transaction.id in self.entries:
+            return
+
+        entry = [-new_transaction.reward, next(self.counter), new_transaction]
+        self.entries[new_transaction.id] = entry
+        heapq.heappush(self.queue, entry)
+
+    def discard_removed(self):
+        """ Drop lazily removed entries from the top of the heap """
+        while self.queue and self.queue[0][2] is None:
+            heapq.heappop(self.queue)
 
     def pop(self, count):
-        count = min(self.length(), count)
-        elements = self.queue[:count]
-        self.queue = self.queue[count:]
+        elements = []
+        while len(elements) < count and self.entries:
+            self.discard_removed()
+            _, _, transaction = heapq.heappop(self.queue)
+            del self.entries[transaction.id]
+            elements.append(transaction)
         return elements
 
     def remove(self, transaction):
-        self.queue.remove(transaction)
+        if transaction.id not in self.entries:
+            raise ValueError(f"Transaction {transaction.id} not present in the queue")
+
+        entry = self.entries.pop(transaction.id)
+        entry[2] = None             # Marked as removed, dropped when it reaches the top
+
+        # Rebuild the heap once the removed entries dominate it
+        if len(self.queue) > 2 * len(self.entries) + 32:
+            self.queue = [ entry for entry in self.queue if entry[2] is not None ]
+            heapq.heapify(self.queue)
 
     def get(self, count):
-        count = min(self.length(), count)
-        return self.queue[:count]
+        """ Return the top count transactions without removing them """
+        count = min(count, len(self.entries))
+        entries = []
+        while len(entries) < count:
+            self.discard_removed()
+            entries.append(heapq.heappop(self.queue))
+
+        for entry in entries:
+            heapq.heappush(self.queue, entry)
+        return [ entry[2] for entry in entries ]
 
     def display(self):
-        for tx in self.queue:
-            print(tx.id, end=" ")
-        print()
\ No newline at end of file
+        for entry in sorted(self.entries.values()):
+            print(entry[2].id, end=" ")
+        print()
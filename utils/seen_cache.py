@@ -0,0 +1,135 @@
+"""
+Bounded caches of already seen object ids (e.g. gossiped transactions),
+used to deduplicate the messages received by a node in O(1).
+"""
+
+import hashlib
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SeenCache:
+    """
+    Exact cache - set of ids with insertion-ordered eviction of the oldest ids
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.ids = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, id):
+        return id in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, id):
+        if id in self.ids:
+            return
+
+        self.ids[id] = None
+        if len(self.ids) > self.capacity:
+            self.ids.popitem(last=False)
+            self.evictions += 1
+
+    def check_and_add(self, id):
+        """
+        Return True if id has already been seen, else remember it and return False
+        """
+        if id in self.ids:
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        self.add(id)
+        return False
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class BloomFilterCache(SeenCache):
+    """
+    Approximate cache - two generations of Bloom filters sized for capacity ids
+    with the given false-positive rate. Once the current generation is full it
+    becomes the old one, so memory stays bounded while the recent ids are kept.
+    The bits are packed 8 to a byte.
+    """
+
+    def __init__(self, capacity, false_positive_rate=0.001):
+        super().__init__(capacity)
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+
+        num_bytes = (self.num_bits + 7) // 8
+        self.current = np.zeros(num_bytes, dtype=np.uint8)
+        self.old = np.zeros(num_bytes, dtype=np.uint8)
+        self.count = 0
+
+    def get_indexes(self, id):
+        """
+        Double hashing - derive num_hashes bit positions from a single digest,
+        returned as the indexes of their bytes and the masks of the bits in the bytes
+        """
+        digest = hashlib.blake2b(str(id).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        positions = np.array([ (h1 + i * h2) % self.num_bits for i in range(self.num_hashes) ], dtype=np.int64)
+        return positions >> 3, np.left_shift(1, positions & 7).astype(np.uint8)
+
+    def is_set(self, bits, indexes):
+        byte_indexes, masks = indexes
+        return bool(np.all(bits[byte_indexes] & masks))
+
+    def __contains__(self, id):
+        indexes = self.get_indexes(id)
+        return self.is_set(self.current, indexes) or self.is_set(self.old, indexes)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, id, indexes=None):
+        indexes = self.get_indexes(id) if indexes is None else indexes
+        if self.is_set(self.current, indexes):
+            return
+
+        if self.count >= self.capacity:
+            self.old, self.current = self.current, self.old
+            self.current[:] = 0
+            self.count = 0
+            self.evictions += self.capacity
+
+        np.bitwise_or.at(self.current, indexes[0], indexes[1])
+        self.count += 1
+
+    def check_and_add(self, id):
+        indexes = self.get_indexes(id)
+        if self.is_set(self.current, indexes) or self.is_set(self.old, indexes):
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        self.add(id, indexes)
+        return False
+
+
+def create_seen_cache(params):
+    """
+    Create the seen-id cache as per the params
+    """
+    cache_type = params.get("seen_cache_type", "set")
+    capacity = params.get("seen_cache_capacity", 100000)
+
+    if cache_type == "set":
+        return SeenCache(capacity)
+    elif cache_type == "bloom":
+        return BloomFilterCache(capacity, params.get("seen_cache_fp_rate", 0.001))
+    else:
+        raise RuntimeError(f"Unknown seen cache type '{cache_type}' specified")
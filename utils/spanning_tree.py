@@ -1,91 +1,107 @@
+import numpy as np
+
+from utils.graph_algorithms import kruskal, prim
+
+
 class SpanningTree:
     """
-    Spanning Tree class for efficient broadcast of the blocks
+    Spanning Tree class for efficient broadcast of the blocks.
+    The edges are weighted by the expected latency of the link when a latency model is
+    provided, otherwise every edge has weight 1 (and the tree is an arbitrary spanning tree).
     """
 
-    def __init__(self, nodes):
+    def __init__(self, nodes, latency_model=None):
         self.V = len(nodes)         # No. of vertices
-        self.graph = []             # Dictionary to store graph
+        self.graph = []             # List of the edges [u, v, w]
         self.nodes = nodes
+        self.latency_model = latency_model
 
         for id, node in self.nodes.items():
             for neighbour_id in node.neighbours_ids:
-                self.add_edge(node.id, neighbour_id, 1)
+                self.add_edge(node.id, neighbour_id, self.get_weight(node, self.nodes[neighbour_id]))
+
+    def get_weight(self, node, neighbour):
+        """ Weight of the edge - expected latency of the link between the nodes """
+        if self.latency_model is None:
+            return 1
+        return self.latency_model.get_mean_delay(node.location, neighbour.location)
 
     def add_edge(self, u, v, w):
         """ Establishe edge from u to v with weight w """
         self.graph.append([u, v, w])
 
-    def find(self, parent, i):
-        """ Find set of an element i (uses path compression technique) """
-        if parent[i] == i:
-            return i
-        return self.find(parent, parent[i])
-
-    def union(self, parent, rank, x, y):
-        """ Perform union of two sets of x and y (uses union by rank) """
-        xroot = self.find(parent, x)
-        yroot = self.find(parent, y)
-
-        # Attach smaller rank tree under root of
-        # high rank tree (Union by Rank)
-        if rank[xroot] < rank[yroot]:
-            parent[xroot] = yroot
-        elif rank[xroot] > rank[yroot]:
-            parent[yroot] = xroot
-
-        # If ranks are same, then make one as root
-        # and increment its rank by one
-        else:
-            parent[yroot] = xroot
-            rank[xroot] += 1
+    def get_edge_arrays(self):
+        """ Return the edges as arrays of (source, destination) indices of the nodes and weights """
+        index = { node_id: idx for idx, node_id in enumerate(self.nodes) }
+        sources = np.array([ index[u] for u, _, _ in self.graph ], dtype=np.int64)
+        destinations = np.array([ index[v] for _, v, _ in self.graph ], dtype=np.int64)
+        weights = np.array([ w for _, _, w in self.graph ], dtype=float)
+        return index, sources, destinations, weights
 
     def Kruskal_MST(self):
-        """ Perform Spanning Tree computation using Kruskal's algorithm """
-        result = []     # Store the resultant MST
+        """ Perform Minimum Spanning Tree computation using Kruskal's algorithm """
+        _, sources, destinations, weights = self.get_edge_arrays()
+        tree_edges = kruskal(self.V, sources, destinations, weights)
 
-        # Step 1: Sort all the edges in non-decreasing order of their weight
-        # Note - (not required in ShardEval)
-        # self.graph = sorted(self.graph,
-        # 					key=lambda item: item[2])
+        network_info = {}
+        for node_id in self.nodes:
+            network_info[node_id] = set()
 
-        parent, rank = {}, {}
+        for edge_id in tree_edges.tolist():
+            u, v, _ = self.graph[edge_id]
+            network_info[u].add(v)
 
-        # Create V subsets with single elements
+        return network_info
+
+    def Prim_MST(self, root_id):
+        """ Perform Minimum Spanning Tree computation using Prim's algorithm, growing the tree from the root """
+        index, sources, destinations, weights = self.get_edge_arrays()
+        parents = prim(self.V, sources, destinations, weights, index[root_id])
+
+        node_ids = list(self.nodes)
+        network_info = {}
         for node_id in self.nodes:
-            parent[node_id] = node_id
-            rank[node_id] = 0
-
-        i = 0   # An index variable, used for sorted edges
-        e = 0   # An index variable, used for result[]
-
-        # Number of edges to be taken is equal to V-1
-        while e < self.V - 1:
-
-            # Step 2: Pick the smallest edge and increment the index for next iteration
-            u, v, w = self.graph[i]
-            i += 1
-            x = self.find(parent, u)
-            y = self.find(parent, v)
-
-            # If including this edge does't cause cycle, include it in result
-            # and increment the indexof result for next edge
-            if x != y:
-                e += 1
-                result.append([u, v, w])
-                self.union(parent, rank, x, y)
-            # Else discard the edge
-
-        minimum_cost = 0
+            network_info[node_id] = set()
+
+        for idx, parent in enumerate(parents.tolist()):
+            if parent >= 0:
+                network_info[node_ids[parent]].add(node_ids[idx])
+
+        return network_info
+
+    def min_depth_tree(self, root_id):
+        """
+        Perform Breadth-first search from the root (shard leader) to build the tree of minimum depth,
+        every node is attached to the parent in the previous level with the least weighted edge
+        """
+        adjacency = { node_id: {} for node_id in self.nodes }
+        for u, v, w in self.graph:
+            adjacency[u][v] = w
+            adjacency[v][u] = w
+
+        depth = { root_id: 0 }
+        parent = {}                 # node -> (parent, weight of the edge)
+        level = [ root_id ]
+        while level:
+            next_level = []
+            for u in level:
+                for v, w in adjacency[u].items():
+                    if v not in depth:
+                        depth[v] = depth[u] + 1
+                        parent[v] = (u, w)
+                        next_level.append(v)
+                    elif depth[v] == depth[u] + 1 and w < parent[v][1]:
+                        parent[v] = (u, w)
+            level = next_level
+
+        if len(depth) != self.V:
+            raise RuntimeError("Spanning Tree can't be created as the graph is not connected.")
+
         network_info = {}
         for node_id in self.nodes:
             network_info[node_id] = set()
 
-        for u, v, weight in result:
-            minimum_cost += weight
+        for v, (u, _) in parent.items():
             network_info[u].add(v)
 
-        if minimum_cost != self.V - 1:
-            raise RuntimeError("Spanning Tree has weighted edges.")
-
-        return network_info
\ No newline at end of file
+        return network_info